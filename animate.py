@@ -4,6 +4,7 @@ Contains the best 10 professional animations for enhanced user experience
 """
 
 import streamlit as st
+from styles import register_style
 
 # ============================================================================
 # 1. FADE-IN ANIMATION FOR PRODUCT CARDS
@@ -14,7 +15,7 @@ def add_fade_in_animation():
     Smooth fade-in effect for product cards as they appear.
     Creates a professional, smooth entrance animation.
     """
-    st.markdown("""
+    register_style("animate.fade_in_animation", """
     <style>
         /* Fade-in animation for product cards */
         @keyframes fadeIn {
@@ -41,7 +42,7 @@ def add_fade_in_animation():
         .element-container:nth-child(5) { animation-delay: 0.5s; }
         .element-container:nth-child(6) { animation-delay: 0.6s; }
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
 
 # ============================================================================
@@ -53,7 +54,7 @@ def add_card_hover_effect():
     Smooth lift effect with expanding shadow on hover.
     Makes cards feel interactive and responsive.
     """
-    st.markdown("""
+    register_style("animate.card_hover_effect", """
     <style>
         /* Card hover effect */
         .element-container {
@@ -77,7 +78,7 @@ def add_card_hover_effect():
             transition: transform 0.3s ease;
         }
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
 
 # ============================================================================
@@ -89,7 +90,7 @@ def add_button_ripple_effect():
     Material Design ripple effect on buttons.
     Provides clear visual feedback on clicks.
     """
-    st.markdown("""
+    register_style("animate.button_ripple_effect", """
     <style>
         /* Button ripple animation */
         @keyframes ripple {
@@ -136,7 +137,7 @@ def add_button_ripple_effect():
             height: 300px;
         }
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
 
 # ============================================================================
@@ -148,7 +149,7 @@ def add_skeleton_loading():
     Elegant skeleton screen with shimmer effect during loading.
     Better perceived performance than spinners.
     """
-    st.markdown("""
+    register_style("animate.skeleton_loading", """
     <style>
         /* Skeleton loading animation */
         @keyframes shimmer {
@@ -183,7 +184,7 @@ def add_skeleton_loading():
             100% { transform: rotate(360deg); }
         }
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
 
 # ============================================================================
@@ -195,7 +196,7 @@ def add_smooth_scroll():
     Smooth scrolling behavior throughout the app.
     Creates a more polished, native-app feel.
     """
-    st.markdown("""
+    register_style("animate.smooth_scroll", """
     <style>
         /* Smooth scrolling */
         html {
@@ -235,7 +236,7 @@ def add_smooth_scroll():
             background: linear-gradient(180deg, #45a049, #3d8b40);
         }
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
 
 # ============================================================================
@@ -247,7 +248,7 @@ def add_favorite_heart_animation():
     Bouncy heart animation when favoriting products.
     Adds delightful micro-interaction feedback.
     """
-    st.markdown("""
+    register_style("animate.favorite_heart_animation", """
     <style>
         /* Heart bounce animation */
         @keyframes heartBeat {
@@ -284,7 +285,7 @@ def add_favorite_heart_animation():
             animation: pulse 1.5s infinite;
         }
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
 
 # ============================================================================
@@ -296,7 +297,7 @@ def add_modal_animation():
     Smooth slide-in animation for modals/dialogs.
     Professional entrance and exit animations.
     """
-    st.markdown("""
+    register_style("animate.modal_animation", """
     <style>
         /* Modal slide-in from bottom */
         @keyframes slideInUp {
@@ -335,7 +336,7 @@ def add_modal_animation():
             animation: slideInUp 0.3s cubic-bezier(0.4, 0, 0.2, 1) reverse;
         }
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
 
 # ============================================================================
@@ -347,7 +348,7 @@ def add_animated_gradient_background():
     Subtle animated gradient background.
     Creates modern, dynamic atmosphere.
     """
-    st.markdown("""
+    register_style("animate.animated_gradient_background", """
     <style>
         /* Animated gradient background */
         @keyframes gradientShift {
@@ -394,7 +395,7 @@ def add_animated_gradient_background():
             z-index: 0;
         }
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
 
 # ============================================================================
@@ -406,7 +407,7 @@ def add_toast_notification_animation():
     Slide-in toast notifications for success/error messages.
     Non-intrusive feedback animations.
     """
-    st.markdown("""
+    register_style("animate.toast_notification_animation", """
     <style>
         /* Toast slide-in from right */
         @keyframes slideInRight {
@@ -462,7 +463,7 @@ def add_toast_notification_animation():
             background: linear-gradient(90deg, #fff3e0 0%, #ffffff 100%);
         }
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
 
 # ============================================================================
@@ -474,7 +475,7 @@ def add_counter_badge_animation():
     Animated counter badges for statistics and notifications.
     Eye-catching number updates.
     """
-    st.markdown("""
+    register_style("animate.counter_badge_animation", """
     <style>
         /* Counter pop animation */
         @keyframes counterPop {
@@ -536,7 +537,7 @@ def add_counter_badge_animation():
             border-color: #4CAF50;
         }
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
 
 # ============================================================================
@@ -546,11 +547,13 @@ def add_counter_badge_animation():
 def apply_all_animations():
     """
     Apply all 10 modern animations to the app.
-    Call this once in your main app.py file.
+    Call this once in your main app.py file, before inject_styles().
     
     Usage:
         from animate import apply_all_animations
+        from styles import inject_styles
         apply_all_animations()
+        inject_styles()
     """
     add_fade_in_animation()              # 1. Fade-in cards
     add_card_hover_effect()              # 2. Card hover lift
@@ -640,7 +643,7 @@ def apply_performance_mode():
     Minimal animations optimized for slower devices.
     Reduces animation complexity while maintaining polish.
     """
-    st.markdown("""
+    register_style("animate.performance_mode", """
     <style>
         /* Simplified animations for performance */
         * {
@@ -656,7 +659,7 @@ def apply_performance_mode():
             }
         }
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
 
 # ============================================================================
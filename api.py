@@ -0,0 +1,426 @@
+"""
+Headless JSON API over the product catalog, for kiosks and app wrappers
+
+Run it on its own:
+    python api.py --port 8600
+or inside the Streamlit server process by setting ASANKAR_API_PORT, in which
+case it shares the catalog cache and filter index with app.py.
+
+    GET  /api/products?q=&tags=a,b&colors=&materials=&media=image
+                      &language=Kurdish&sort=newest&page=1&page_size=24
+    GET  /api/products/<product_id>
+    GET  /api/facets?language=Kurdish
+    GET  /api/stats
+    POST /api/events  {"event": "like|view|link|search", "product_id", "visitor_id", "query"}
+
+Events need a visitor_id (a stable ID the client keeps, e.g. per kiosk
+session); it is scoped to the client address so repeat events are dropped
+and unique visitors counted as for Streamlit sessions.
+
+GET responses carry an ETag derived from the catalog version and the query;
+a matching If-None-Match is answered with 304 before any filtering is done.
+Responses listing media whose thumbnail or placeholder is still being built
+get no ETag and are not cached, so clients pick the media up on a later
+request.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+import pandas as pd
+from catalog import load_catalog, get_display_columns, get_youtube_thumbnail_url
+from filters import FACET_COLUMNS, get_facets, filter_products
+from settings import get_product_stats, get_analytics_totals, increment_stats
+from similar import get_similar_products
+from placeholders import get_row_placeholder, needs_precompute
+from thumbnails import get_thumbnail_urls
+from metrics import inc_counter
+from visitors import get_unique_count
+
+API_PORT_ENV = "ASANKAR_API_PORT"
+API_HOST_ENV = "ASANKAR_API_HOST"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8600
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+MAX_CACHED_BODIES = 256
+MAX_EVENT_BYTES = 4096
+
+SORT_OPTIONS = ("default", "newest", "oldest")
+
+# Event name -> stat deltas, as recorded by the Streamlit cards
+EVENT_STATS = {
+    "like": {"total_likes": 1},
+    "view": {"total_views": 1, "total_clicks": 1},
+    "link": {"total_link_visits": 1},
+    "search": {"total_searches": 1}
+}
+
+_lock = threading.Lock()
+_bodies = OrderedDict()  # etag -> encoded JSON body
+_server_started = False
+logger = logging.getLogger(__name__)
+
+class ApiError(Exception):
+    """Request error returned to the client as {"error": message}"""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# ---------- Helpers ----------
+def make_etag(*parts):
+    """Strong ETag from the parts that determine a response"""
+    digest = hashlib.sha1("\x1f".join(map(str, parts)).encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+def to_json_value(value):
+    """Plain JSON value for a DataFrame cell"""
+    if value is None or (not isinstance(value, (list, dict)) and pd.isna(value)):
+        return None
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+def split_param(params, name):
+    """Comma-separated query parameter -> list of values"""
+    return [item.strip() for value in params.get(name, []) for item in value.split(",") if item.strip()]
+
+def get_param(params, name, default=None):
+    """First value of a query parameter"""
+    values = params.get(name)
+    return values[0] if values else default
+
+def get_int_param(params, name, default, low, high):
+    """Integer query parameter clamped to [low, high]"""
+    try:
+        value = int(get_param(params, name, default))
+    except (TypeError, ValueError):
+        raise ApiError(400, f"'{name}' must be an integer")
+    return max(low, min(high, value))
+
+def get_catalog():
+    """The shared cached catalog, or a 503 if it cannot be loaded"""
+    df = load_catalog()
+    if df.empty:
+        raise ApiError(503, "Catalog unavailable")
+    return df
+
+def serialize_product(product_id, row, columns, columns_count=3):
+    """
+    JSON-ready product: sheet fields and media info
+    Missing thumbnails are queued for a background build, as the Streamlit
+    cards do. Returns (item, whether all derived media was ready)
+    """
+    media_type = row["_media_type"]
+    youtube_id = row["_youtube_id"] if isinstance(row["_youtube_id"], str) else None
+    thumbnail = None
+    placeholder = None
+    ready = True
+    if media_type == "image":
+        thumbnail = get_thumbnail_urls(row["_url"], columns_count)
+        placeholder = get_row_placeholder(row, row["_url"])
+        # Images whose placeholder failed recently will not get one soon
+        ready = thumbnail is not None and (placeholder is not None or not needs_precompute(row["_url"]))
+    elif media_type == "youtube":
+        thumbnail = get_thumbnail_urls(get_youtube_thumbnail_url(youtube_id), columns_count)
+        ready = thumbnail is not None
+        thumbnail = thumbnail or {"jpg": get_youtube_thumbnail_url(youtube_id)}
+
+    item = {
+        "id": str(product_id),
+        "fields": {col: to_json_value(row[col]) for col in columns},
+        "media": {
+            "type": media_type,
+            "url": row["_url"] or None,
+            "youtube_id": youtube_id,
+            "thumbnail": thumbnail,
+            "placeholder": placeholder["lqip"] if placeholder else None,
+            "aspect_ratio": to_json_value(placeholder["aspect_ratio"]) if placeholder else None
+        }
+    }
+    return item, ready
+
+# ---------- Endpoints ----------
+def list_products(params):
+    """
+    One page of filtered, sorted products
+    Returns (etag, builder returning (payload, complete))
+    """
+    df = get_catalog()
+    language = get_param(params, "language", "Kurdish")
+    if language not in FACET_COLUMNS:
+        raise ApiError(400, f"'language' must be one of {', '.join(FACET_COLUMNS)}")
+    sort = get_param(params, "sort", "default")
+    if sort not in SORT_OPTIONS:
+        raise ApiError(400, f"'sort' must be one of {', '.join(SORT_OPTIONS)}")
+
+    query = {
+        "search": get_param(params, "q", "").strip(),
+        "tags": sorted(split_param(params, "tags")),
+        "colors": sorted(split_param(params, "colors")),
+        "materials": sorted(split_param(params, "materials")),
+        "media_types": sorted(split_param(params, "media")),
+        "language": language
+    }
+    page = get_int_param(params, "page", 1, 1, 10**6)
+    page_size = get_int_param(params, "page_size", DEFAULT_PAGE_SIZE, 1, MAX_PAGE_SIZE)
+    columns_count = get_int_param(params, "columns", 3, 1, 7)
+    etag = make_etag("products", df.attrs.get("catalog_version"), json.dumps(query, ensure_ascii=False, sort_keys=True),
+                     sort, page, page_size, columns_count)
+
+    def build():
+        filtered_df = filter_products(df, **query)
+        if sort == "newest":
+            filtered_df = filtered_df.iloc[::-1]
+        total = len(filtered_df)
+        start = (page - 1) * page_size
+        columns = get_display_columns(df)
+        items = [
+            serialize_product(product_id, row, columns, columns_count)
+            for product_id, row in filtered_df.iloc[start:start + page_size].iterrows()
+        ]
+        payload = {
+            "version": df.attrs.get("catalog_version"),
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "pages": (total + page_size - 1) // page_size,
+            "items": [item for item, _ in items]
+        }
+        return payload, all(ready for _, ready in items)
+
+    return etag, build
+
+def get_product_detail(product_id, params):
+    """One product with its counters and similar product IDs"""
+    df = get_catalog()
+    if product_id not in df.index:
+        raise ApiError(404, "Product not found")
+    stats = get_product_stats(product_id)
+    columns_count = get_int_param(params, "columns", 3, 1, 7)
+    etag = make_etag("product", df.attrs.get("catalog_version"), product_id, sorted(stats.items()), columns_count)
+
+    def build():
+        payload, ready = serialize_product(product_id, df.loc[product_id], get_display_columns(df), columns_count)
+        payload["stats"] = stats
+        payload["unique_viewers"] = get_unique_count("total_views", product_id)
+        payload["similar"] = [
+            {"id": str(other), "similarity": round(score, 3)}
+            for other, score in get_similar_products(df, product_id)
+        ]
+        return payload, ready
+
+    return etag, build
+
+def list_facets(params):
+    """Filter options for a language"""
+    df = get_catalog()
+    language = get_param(params, "language", "Kurdish")
+    if language not in FACET_COLUMNS:
+        raise ApiError(400, f"'language' must be one of {', '.join(FACET_COLUMNS)}")
+    etag = make_etag("facets", df.attrs.get("catalog_version"), language)
+
+    def build():
+        tags, colors, materials = get_facets(df, language)
+        media_types = sorted(set(df["_media_type"]))
+        return {"tags": tags, "colors": colors, "materials": materials, "media": media_types}, True
+
+    return etag, build
+
+def get_stats(params):
+    """Global analytics totals"""
+    totals = get_analytics_totals()
+    return make_etag("stats", sorted(totals.items())), lambda: (totals, True)
+
+def record_event(payload, client_host):
+    """
+    Record a like/view/link/search event from a client
+
+    Args:
+        payload: Decoded request body
+        client_host: Address of the client, part of the visitor identity
+    """
+    if not isinstance(payload, dict):
+        raise ApiError(400, "Expected a JSON object")
+    event = payload.get("event")
+    if event not in EVENT_STATS:
+        raise ApiError(400, f"'event' must be one of {', '.join(EVENT_STATS)}")
+
+    # Without a visitor increment_stats would fall back to the Streamlit
+    # session, which does not exist here, and skip the repeat check
+    visitor_id = str(payload.get("visitor_id") or "").strip()
+    if not visitor_id:
+        raise ApiError(400, "'visitor_id' is required")
+    visitor_id = f"api:{client_host}:{visitor_id}"
+    if event == "search":
+        query = str(payload.get("query", "")).strip().lower()
+        if not query:
+            raise ApiError(400, "'query' is required for search events")
+        increment_stats(EVENT_STATS[event], visitor_id=visitor_id, dedup_key=query)
+        return {"ok": True}
+
+    product_id = payload.get("product_id")
+    if product_id is None or str(product_id) not in get_catalog().index:
+        raise ApiError(404, "Product not found")
+    increment_stats(EVENT_STATS[event], product_ids=str(product_id), visitor_id=visitor_id)
+    return {"ok": True}
+
+# ---------- HTTP server ----------
+def get_body(etag, build):
+    """
+    Encoded JSON body for an ETag, built once and kept in a small LRU
+    Returns (body, complete); incomplete bodies (media still being built)
+    are not cached and must not be sent with the ETag
+    """
+    with _lock:
+        body = _bodies.get(etag)
+        if body is not None:
+            _bodies.move_to_end(etag)
+            return body, True
+    payload, complete = build()
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    if complete:
+        with _lock:
+            _bodies[etag] = body
+            while len(_bodies) > MAX_CACHED_BODIES:
+                _bodies.popitem(last=False)
+    return body, complete
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    """Routes /api/* requests to the endpoint functions"""
+    def _send(self, status, body=b"", etag=None):
+        self.send_response(status)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if body:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        self._send(status, json.dumps({"error": message}).encode("utf-8"))
+
+    def _count(self, endpoint, status):
+        inc_counter("asankar_api_requests_total", labels={"endpoint": endpoint, "status": str(status)})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        path = url.path.rstrip("/")
+        endpoint = "unknown"
+        try:
+            if path == "/api/products":
+                endpoint = "products"
+                etag, build = list_products(params)
+            elif path.startswith("/api/products/"):
+                endpoint = "product"
+                etag, build = get_product_detail(unquote(path[len("/api/products/"):]), params)
+            elif path == "/api/facets":
+                endpoint = "facets"
+                etag, build = list_facets(params)
+            elif path == "/api/stats":
+                endpoint = "stats"
+                etag, build = get_stats(params)
+            else:
+                raise ApiError(404, "Not found")
+
+            match = self.headers.get("If-None-Match", "")
+            if etag in [tag.strip() for tag in match.split(",")] or match.strip() == "*":
+                self._count(endpoint, 304)
+                self._send(304, etag=etag)
+                return
+            body, complete = get_body(etag, build)
+            self._send(200, body, etag=etag if complete else None)
+            self._count(endpoint, 200)
+        except ApiError as e:
+            self._count(endpoint, e.status)
+            self._send_error(e.status, str(e))
+        except Exception:
+            logger.exception("API request failed: GET %s", self.path)
+            self._count(endpoint, 500)
+            self._send_error(500, "Internal error")
+
+    def do_POST(self):
+        if urlparse(self.path).path.rstrip("/") != "/api/events":
+            self._send_error(404, "Not found")
+            return
+        try:
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                raise ApiError(400, "Invalid Content-Length")
+            if length < 0:
+                raise ApiError(400, "Invalid Content-Length")
+            if length > MAX_EVENT_BYTES:
+                raise ApiError(413, "Event too large")
+            try:
+                payload = json.loads(self.rfile.read(length) or b"null")
+            except json.JSONDecodeError:
+                raise ApiError(400, "Invalid JSON")
+            body = json.dumps(record_event(payload, self.client_address[0])).encode("utf-8")
+            self._count("events", 202)
+            self._send(202, body)
+        except ApiError as e:
+            self._count("events", e.status)
+            self._send_error(e.status, str(e))
+        except Exception:
+            logger.exception("API request failed: POST %s", self.path)
+            self._count("events", 500)
+            self._send_error(500, "Internal error")
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type, If-None-Match")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+def start_api_server():
+    """
+    Start the API in a daemon thread if ASANKAR_API_PORT is set
+    Listens on ASANKAR_API_HOST, 127.0.0.1 unless configured otherwise.
+    Safe to call on every rerun: only the first call starts anything
+    """
+    global _server_started
+    port = os.environ.get(API_PORT_ENV)
+    host = os.environ.get(API_HOST_ENV) or DEFAULT_HOST
+    with _lock:
+        if _server_started or not port:
+            return
+        _server_started = True
+    try:
+        server = ThreadingHTTPServer((host, int(port)), _ApiHandler)
+    except (OSError, ValueError):
+        return
+    threading.Thread(target=server.serve_forever, name="api-http", daemon=True).start()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Asankar product JSON API")
+    parser.add_argument("--host", default=os.environ.get(API_HOST_ENV) or DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=int(os.environ.get(API_PORT_ENV) or DEFAULT_PORT))
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer((args.host, args.port), _ApiHandler)
+    print(f"Serving the product API on http://{args.host}:{args.port}/api/products")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,19 @@
+import time
 import streamlit as st
-from settings import load_google_sheet, load_analytics, save_analytics, increment_stat, load_app_data, save_app_data
-from display import display_products, show_product_modal
+from settings import get_analytics_totals, increment_stats, load_app_data, update_app_data
+from catalog import load_catalog, MEDIA_TYPE_LABELS
+from filters import get_facets, filter_products
+from display import display_products, display_products_windowed, get_window_bounds, show_product_modal, render_sidebar_stats
+from product_grid import infinite_product_feed, html_product_grid
+from prefetch import prefetch_next_page
 from rotlogo import add_rotated_background_logo
+from styles import register_style, inject_styles
+from assets import get_sidebar_logo_url
+from profiler import span, record, is_enabled, enable_from_query_params, render_debug_panel
+from metrics import start_exporter, cache_lookup, record_rerun, get_session_id
+from sessions import track_session
+from visitors import record_visit
+from api import start_api_server
 import pandas as pd
 
 # ----------------- Page config -----------------
@@ -14,8 +26,32 @@ st.set_page_config(
     }
 )
 
+# ----------------- Profiling and metrics -----------------
+rerun_start = time.perf_counter()
+rerun_recorded = False
+show_debug_panel = enable_from_query_params()
+
+def record_rerun_end():
+    """
+    Record this run's duration once; called at the end of the script and
+    before every st.rerun()/st.stop() that would skip the end
+    """
+    global rerun_recorded
+    if rerun_recorded:
+        return
+    rerun_recorded = True
+    rerun_seconds = time.perf_counter() - rerun_start
+    record_rerun(get_session_id(), rerun_seconds)
+    if is_enabled():
+        record("app.rerun", rerun_seconds)
+
+# Prometheus endpoint/file, if configured in the environment (once per process)
+start_exporter()
+# Headless JSON API, if ASANKAR_API_PORT is set (once per process)
+start_api_server()
+
 # ----------------- Mobile-First CSS -----------------
-st.markdown("""
+register_style("app.base", """
 <style>
     /* CRITICAL: Force mobile buttons to stay horizontal */
     @media (max-width: 768px) {
@@ -123,17 +159,23 @@ st.markdown("""
         margin: 2px !important;
     }
 </style>
-""", unsafe_allow_html=True)
+""")
 
 # ----------------- Initialize session state -----------------
 if "visible_count" not in st.session_state:
     st.session_state.visible_count = 12
 
+if "grid_mode" not in st.session_state:
+    st.session_state.grid_mode = "load_more"
+
+if "window_start" not in st.session_state:
+    st.session_state.window_start = 0
+
 if "favorites" not in st.session_state:
     st.session_state.favorites = set()
 
-if "selected_product" not in st.session_state:
-    st.session_state.selected_product = None
+if "selected_product_id" not in st.session_state:
+    st.session_state.selected_product_id = None
 
 if "sort_option" not in st.session_state:
     st.session_state.sort_option = "None"
@@ -148,26 +190,37 @@ if "language" not in st.session_state:
     app_data = load_app_data()
     st.session_state.language = app_data.get("language", "Kurdish")
 
-# Initialize analytics in session state
-if "analytics_loaded" not in st.session_state:
-    st.session_state.analytics = load_analytics()
-    st.session_state.analytics_loaded = True
+# Memory accounting; idle sessions lose large rebuildable objects
+track_session()
+
+# Unique visitors: once per browser session
+if "visit_recorded" not in st.session_state:
+    record_visit(get_session_id())
+    st.session_state.visit_recorded = True
 
 # ----------------- Add rotated background logo -----------------
-try:
-    add_rotated_background_logo(
-        logo_path="background_logo.png",
-        rotation=-25,
-        opacity=0.05,
-        size="300px"
-    )
-except Exception as e:
-    pass
+with span("app.styles"):
+    try:
+        add_rotated_background_logo(
+            logo_path="background_logo.png",
+            rotation=-25,
+            opacity=0.05,
+            size="300px"
+        )
+    except Exception as e:
+        pass
+
+    # Emit all registered CSS as one stylesheet (once per session)
+    inject_styles()
 
 # ----------------- Sidebar -----------------
 # Logo
 try:
-    st.sidebar.image("fallback_logo.png", use_container_width=True)
+    # Pre-rendered, content-hashed static file instead of re-sending the PNG
+    st.sidebar.markdown(
+        f'<img src="{get_sidebar_logo_url("fallback_logo.png")}" style="width: 100%;" alt="Asankar">',
+        unsafe_allow_html=True
+    )
 except Exception:
     st.sidebar.markdown("## 🏢 Asankar")
 
@@ -193,9 +246,8 @@ selected_language = st.sidebar.radio(
 # Save language preference if changed
 if selected_language != st.session_state.language:
     st.session_state.language = selected_language
-    app_data = load_app_data()
-    app_data["language"] = selected_language
-    save_app_data(app_data)
+    update_app_data(lambda app_data: app_data.update(language=selected_language))
+    record_rerun_end()
     st.rerun()
 
 language = st.session_state.language
@@ -225,24 +277,43 @@ for i in range(1, 8):
             type=button_type
         ):
             st.session_state.columns_count = i
+            record_rerun_end()
             st.rerun()
 
 columns_count = st.session_state.columns_count
 
+# Grid mode: append pages or keep a bounded window of cards
+grid_mode_labels = {
+    "load_more": "⬇️ Load More",
+    "windowed": "🪟 Windowed",
+    "infinite": "♾️ Infinite Scroll",
+    "html": "⚡ Fast Grid"
+}
+st.session_state.grid_mode = st.sidebar.radio(
+    "Grid mode",
+    list(grid_mode_labels.keys()),
+    index=list(grid_mode_labels.keys()).index(st.session_state.grid_mode),
+    format_func=lambda x: grid_mode_labels[x],
+    help="Windowed mode only renders the cards around your position, for long browsing sessions"
+)
+
 st.sidebar.markdown("---")
 
 # ----------------- Load Google Sheet -----------------
 try:
     with st.spinner("🔄 Loading products..."):
-        df = load_google_sheet()
+        with span("app.load_catalog"), cache_lookup("catalog"):
+            df = load_catalog()
     
     if df.empty:
         st.warning("⚠️ No products found in the database.")
+        record_rerun_end()
         st.stop()
         
 except Exception as e:
     st.error(f"❌ Error loading products: {str(e)}")
     st.info("💡 Please check your Google Sheets configuration in secrets.toml")
+    record_rerun_end()
     st.stop()
 
 # ----------------- Filtering Section -----------------
@@ -260,30 +331,15 @@ tag_col = "بابەتی" if language == "Kurdish" else "عنصر"
 color_col = "ڕەنگی" if language == "Kurdish" else "الالوان"
 material_col = "پێکهاتەی" if language == "Kurdish" else "مكون من"
 
-# Multi-select filters
-all_tags = set()
-all_colors = set()
-all_materials = set()
-
-for col in [tag_col, color_col, material_col]:
-    if col in df.columns:
-        for val in df[col].dropna():
-            items = str(val).split(',')
-            for item in items:
-                item = item.strip()
-                if item:
-                    if col == tag_col:
-                        all_tags.add(item)
-                    elif col == color_col:
-                        all_colors.add(item)
-                    else:
-                        all_materials.add(item)
+# Filter options come from the per-version facet index
+with span("app.facets"):
+    all_tags, all_colors, all_materials = get_facets(df, language)
 
 # Filter by tags
 if all_tags:
     selected_tags = st.sidebar.multiselect(
         f"🏷️ {tag_col}",
-        sorted(list(all_tags)),
+        all_tags,
         help="Filter by specific tags"
     )
 else:
@@ -293,7 +349,7 @@ else:
 if all_colors:
     selected_colors = st.sidebar.multiselect(
         f"🎨 {color_col}",
-        sorted(list(all_colors)),
+        all_colors,
         help="Filter by specific colors"
     )
 else:
@@ -303,12 +359,24 @@ else:
 if all_materials:
     selected_materials = st.sidebar.multiselect(
         f"🧵 {material_col}",
-        sorted(list(all_materials)),
+        all_materials,
         help="Filter by specific materials"
     )
 else:
     selected_materials = []
 
+# Filter by media type (precomputed at catalog load)
+media_types = [t for t in MEDIA_TYPE_LABELS if t in set(df["_media_type"])]
+if len(media_types) > 1:
+    selected_media = st.sidebar.multiselect(
+        "🎞️ Media",
+        media_types,
+        format_func=lambda x: MEDIA_TYPE_LABELS[x],
+        help="Filter by media type"
+    )
+else:
+    selected_media = []
+
 # ----------------- Sorting Section -----------------
 st.sidebar.markdown("### 🔀 Sort By")
 sort_options = {
@@ -325,37 +393,20 @@ sort_option = st.sidebar.radio(
 )
 
 # ----------------- Apply filters -----------------
-filtered_df = df.copy()
-
-# Text search filter
-if tag_search:
-    mask = filtered_df.apply(
-        lambda r: tag_search.lower() in " ".join(r.astype(str)).lower(), 
-        axis=1
+with span("app.filter"):
+    filtered_df = filter_products(
+        df,
+        search=tag_search,
+        tags=selected_tags,
+        colors=selected_colors,
+        materials=selected_materials,
+        media_types=selected_media,
+        language=language
     )
-    filtered_df = filtered_df[mask]
-    increment_stat("total_searches")
 
-# Tag filter
-if selected_tags and tag_col in filtered_df.columns:
-    mask = filtered_df[tag_col].apply(
-        lambda x: any(tag in str(x) for tag in selected_tags)
-    )
-    filtered_df = filtered_df[mask]
-
-# Color filter
-if selected_colors and color_col in filtered_df.columns:
-    mask = filtered_df[color_col].apply(
-        lambda x: any(color in str(x) for color in selected_colors)
-    )
-    filtered_df = filtered_df[mask]
-
-# Material filter
-if selected_materials and material_col in filtered_df.columns:
-    mask = filtered_df[material_col].apply(
-        lambda x: any(material in str(x) for material in selected_materials)
-    )
-    filtered_df = filtered_df[mask]
+if tag_search:
+    # Counted once per distinct query per session, not on every rerun
+    increment_stats({"total_searches": 1}, dedup_key=tag_search.strip().lower())
 
 # ----------------- Apply sorting -----------------
 if sort_option == "newest":
@@ -363,35 +414,36 @@ if sort_option == "newest":
 elif sort_option == "oldest":
     pass
 
+# A different result set starts the windowed grid from the top again
+window_filters = (language, tag_search, tuple(selected_tags), tuple(selected_colors),
+                  tuple(selected_materials), tuple(selected_media), sort_option)
+if st.session_state.get("window_filters") != window_filters:
+    st.session_state.window_filters = window_filters
+    st.session_state.window_start = 0
+
 # ----------------- Statistics -----------------
 total_products = len(df)
 filtered_products = len(filtered_df)
 
-analytics = st.session_state.analytics
+# Shared process-wide counters, nothing analytics-related lives in the session
+analytics = get_analytics_totals()
 total_likes = analytics.get("total_likes", 0)
 total_views = analytics.get("total_views", 0)
-total_clicks = analytics.get("total_clicks", 0)
 total_link_visits = analytics.get("total_link_visits", 0)
-total_searches = analytics.get("total_searches", 0)
 
 st.sidebar.markdown("---")
-st.sidebar.markdown("### 📈 Statistics")
-st.sidebar.metric("Total Products", total_products)
-if tag_search or selected_tags or selected_colors or selected_materials:
-    st.sidebar.metric("Filtered Products", filtered_products)
-st.sidebar.metric("Favorites", len(st.session_state.favorites))
-
-# Analytics metrics
-with st.sidebar.expander("📊 Analytics"):
-    st.metric("Total Likes", total_likes)
-    st.metric("Total Views", total_views)
-    st.metric("Total Clicks", total_clicks)
-    st.metric("Link Visits", total_link_visits)
-    st.metric("Searches", total_searches)
+with st.sidebar:
+    render_sidebar_stats(
+        total_products,
+        filtered_products,
+        show_filtered=bool(tag_search or selected_tags or selected_colors or selected_materials or selected_media)
+    )
 
 # Reset filters button
 if st.sidebar.button("🔄 Reset All Filters", use_container_width=True):
     st.session_state.visible_count = 12
+    st.session_state.window_start = 0
+    record_rerun_end()
     st.rerun()
 
 # ----------------- Main content -----------------
@@ -399,7 +451,13 @@ col1, col2, col3 = st.columns([2, 1, 1])
 with col1:
     st.markdown("# 📦 Asankar Products")
 with col2:
-    st.metric("Showing", min(st.session_state.visible_count, len(filtered_df)))
+    if st.session_state.grid_mode == "windowed":
+        window_start, window_end = get_window_bounds(filtered_products, columns_count, st.session_state.window_start)
+        st.metric("Showing", f"{window_start + 1 if filtered_products else 0}–{window_end}")
+    elif st.session_state.grid_mode == "infinite":
+        st.metric("Showing", "♾️")
+    else:
+        st.metric("Showing", min(st.session_state.visible_count, len(filtered_df)))
 with col3:
     st.metric("Total", filtered_products)
 
@@ -407,30 +465,59 @@ if filtered_products < total_products:
     st.info(f"🔍 Showing {filtered_products} of {total_products} products (filtered)")
 
 # Display products
-if filtered_df.empty:
-    st.warning("😕 No products match your filters. Try adjusting your search criteria.")
-else:
-    display_products(
-        filtered_df,
-        language=language,
-        columns_count=columns_count,
-        visible_count=st.session_state.visible_count
-    )
-    
-    if st.session_state.visible_count < len(filtered_df):
-        remaining = len(filtered_df) - st.session_state.visible_count
-        col1, col2, col3 = st.columns([1, 2, 1])
-        with col2:
-            if st.button(f"⬇️ Load {min(12, remaining)} More Products", use_container_width=True):
-                st.session_state.visible_count += 12
-                st.rerun()
+with span("app.display_products"):
+    if filtered_df.empty:
+        st.warning("😕 No products match your filters. Try adjusting your search criteria.")
+    elif st.session_state.grid_mode == "windowed":
+        display_products_windowed(
+            filtered_df,
+            language=language,
+            columns_count=columns_count,
+            window_start=st.session_state.window_start
+        )
+        # Warm the thumbnail cache for the cards the "next" button will show
+        _, window_end = get_window_bounds(filtered_products, columns_count, st.session_state.window_start)
+        prefetch_next_page(filtered_df, window_end, columns_count)
+    elif st.session_state.grid_mode == "infinite":
+        infinite_product_feed(
+            filtered_df,
+            language=language,
+            columns_count=columns_count
+        )
     else:
-        st.success("✅ All products loaded!")
+        if st.session_state.grid_mode == "html":
+            html_product_grid(
+                filtered_df,
+                language=language,
+                columns_count=columns_count,
+                visible_count=st.session_state.visible_count
+            )
+        else:
+            display_products(
+                filtered_df,
+                language=language,
+                columns_count=columns_count,
+                visible_count=st.session_state.visible_count
+            )
+    
+        if st.session_state.visible_count < len(filtered_df):
+            # Fetch the next page's media while this one is being viewed
+            prefetch_next_page(filtered_df, st.session_state.visible_count, columns_count)
+        
+            remaining = len(filtered_df) - st.session_state.visible_count
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col2:
+                if st.button(f"⬇️ Load {min(12, remaining)} More Products", use_container_width=True):
+                    st.session_state.visible_count += 12
+                    record_rerun_end()
+                    st.rerun()
+        else:
+            st.success("✅ All products loaded!")
 
 # ----------------- Product Modal -----------------
-if st.session_state.selected_product is not None:
+if st.session_state.selected_product_id is not None:
     show_product_modal(
-        st.session_state.selected_product,
+        st.session_state.selected_product_id,
         language
     )
 
@@ -446,3 +533,8 @@ st.markdown(f"""
     </p>
 </div>
 """, unsafe_allow_html=True)
+
+# ----------------- Profiling and metrics -----------------
+record_rerun_end()
+if show_debug_panel:
+    render_debug_panel()
@@ -0,0 +1,95 @@
+import hashlib
+import io
+import os
+import re
+import threading
+from functools import lru_cache
+import streamlit as st
+from PIL import Image
+
+# Files under static/ are served by Streamlit at app/static/
+# (needs enableStaticServing in .streamlit/config.toml)
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(APP_DIR, "static")
+
+# Generated images get content-hashed names, so a cached copy never goes stale
+ASSETS_SUBDIR = "assets"
+
+# ---------- Static file helpers ----------
+def get_static_path(*parts):
+    """Absolute path of a file inside the static directory"""
+    return os.path.join(STATIC_DIR, *parts)
+
+def get_static_url(*parts):
+    """
+    Browser URL for a file inside the static directory
+    Root-relative, so it also works from inside component iframes
+    """
+    base_path = (st.get_option("server.baseUrlPath") or "").strip("/")
+    prefix = f"/{base_path}" if base_path else ""
+    return f"{prefix}/app/static/" + "/".join(parts)
+
+def write_hashed_asset(stem, data, extension="png"):
+    """
+    Write bytes to static/assets/<stem>-<hash>.<ext> unless already present
+    Returns the file name
+    """
+    digest = hashlib.sha1(data).hexdigest()[:12]
+    name = f"{stem}-{digest}.{extension}"
+    path = get_static_path(ASSETS_SUBDIR, name)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Concurrent writers of the same asset must not share a temp file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return name
+
+def encode_png(image):
+    """Encode a Pillow image as an optimized PNG"""
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", optimize=True)
+    return buffer.getvalue()
+
+# ---------- Logo assets ----------
+def parse_px(size, default=300):
+    """Pixel value of a CSS size like '300px', or the default for other units"""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)px\s*", str(size))
+    return float(match.group(1)) if match else default
+
+@lru_cache(maxsize=16)
+def build_watermark(logo_path, rotation=-30, opacity=0.05, width=600, mtime=None):
+    """
+    Pre-render the background watermark: resized, rotated and faded
+    Returns (static URL, width ratio of the rotated canvas to the logo)
+
+    mtime is only part of the cache key, so an edited logo is re-rendered
+    """
+    with Image.open(logo_path) as logo:
+        logo = logo.convert("RGBA")
+        height = round(logo.height * width / logo.width)
+        logo = logo.resize((int(width), height), Image.LANCZOS)
+
+    rotated = logo.rotate(-rotation, resample=Image.BICUBIC, expand=True)
+    alpha = rotated.getchannel("A").point(lambda a: round(a * opacity))
+    rotated.putalpha(alpha)
+
+    name = write_hashed_asset("watermark", encode_png(rotated))
+    return get_static_url(ASSETS_SUBDIR, name), rotated.width / logo.width
+
+@lru_cache(maxsize=4)
+def build_sidebar_logo(logo_path, width=560, mtime=None):
+    """Pre-render the sidebar logo at display size, returns its static URL"""
+    with Image.open(logo_path) as logo:
+        logo = logo.convert("RGBA")
+        if logo.width > width:
+            height = round(logo.height * width / logo.width)
+            logo = logo.resize((width, height), Image.LANCZOS)
+        data = encode_png(logo)
+
+    return get_static_url(ASSETS_SUBDIR, write_hashed_asset("logo", data))
+
+def get_sidebar_logo_url(logo_path="fallback_logo.png"):
+    """Static URL of the sidebar logo, rendering it on first use"""
+    return build_sidebar_logo(logo_path, mtime=os.path.getmtime(logo_path))
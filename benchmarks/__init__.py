@@ -0,0 +1 @@
+"""Offline benchmarks for the catalog, filter, render and analytics paths"""
@@ -0,0 +1,289 @@
+"""
+Drive many simulated shoppers through app.py at the same time and report
+rerun latency percentiles, throughput, memory per session and analytics
+increments lost to concurrent writes
+
+Usage (from the repository root):
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --sessions 100 --concurrency 25 --actions 30
+
+Each session is a Streamlit AppTest of app.py running in its own thread of
+this process, like script threads of a real server. The Google Sheet is
+replaced by a synthetic CSV fixture (settings.CATALOG_FIXTURE_ENV) and all
+app state lives in a sandboxed temporary directory.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+import streamlit as st
+from benchmarks.run import summarize
+from benchmarks.sandbox import sandbox, warm_media_caches
+from benchmarks.synthetic import TAGS, COLORS, generate_catalog, prepare_catalog
+from settings import CATALOG_FIXTURE_ENV, load_analytics
+
+APP_PATH = os.path.join(REPO_DIR, "app.py")
+DEFAULT_OUTPUT = "load_test_results.json"
+APP_COLUMNS = 2  # the app's default column count, thumbnails are warmed for it
+RUN_TIMEOUT = 120  # seconds per rerun
+
+# Relative frequency of each shopper action
+ACTIONS = {
+    "search": 0.20,
+    "filter": 0.20,
+    "heart": 0.30,
+    "modal": 0.15,
+    "load_more": 0.15
+}
+
+# Analytics totals checked for lost increments. Actions return the
+# (stat, product ID) events they trigger; like the app, a repeat of an event
+# the same visitor already caused is not expected to count again. AppTest
+# gives every session the same session ID ("test session id"), so all
+# simulated shoppers are one visitor and repeats are checked across sessions.
+TRACKED_STATS = ["total_likes", "total_views", "total_clicks"]
+
+# ---------- Shopper actions ----------
+def find_buttons(app, prefix):
+    """Buttons whose key starts with prefix (card buttons are keyed by product ID)"""
+    return [button for button in app.button if button.key and button.key.startswith(prefix)]
+
+def do_search(app, rng):
+    """Type a query (a tag or color word) or clear the search box"""
+    query = "" if rng.random() < 0.3 else rng.choice(TAGS + COLORS)[0]
+    app.sidebar.text_input[0].input(query).run()
+    return []
+
+def do_filter(app, rng):
+    """Pick a value in the tag or color multiselect, or clear it"""
+    multiselects = list(app.sidebar.multiselect)[:2]
+    if not multiselects:
+        return do_search(app, rng)
+    widget = rng.choice(multiselects)
+    if widget.value or rng.random() < 0.2:
+        widget.set_value([]).run()
+    else:
+        widget.select(rng.choice(widget.options)).run()
+    return []
+
+def do_heart(app, rng):
+    """Toggle the heart of a visible card, counting only likes (not un-likes)"""
+    buttons = find_buttons(app, "fav_")
+    if not buttons:
+        return do_search(app, rng)
+    button = rng.choice(buttons)
+    liked = button.label == "🤍"
+    button.click().run()
+    return [("total_likes", button.key[len("fav_"):])] if liked else []
+
+def do_modal(app, rng):
+    """Open the details dialog of a visible card"""
+    buttons = find_buttons(app, "view_")
+    if not buttons:
+        return do_search(app, rng)
+    button = rng.choice(buttons)
+    button.click().run()
+    product_id = button.key[len("view_"):]
+    return [("total_views", product_id), ("total_clicks", product_id)]
+
+def do_load_more(app, rng):
+    """Press "Load More" if there is anything left to load"""
+    buttons = [button for button in app.button if str(button.label).startswith("⬇️ Load")]
+    if not buttons:
+        return do_search(app, rng)
+    buttons[0].click().run()
+    return []
+
+ACTION_HANDLERS = {
+    "search": do_search,
+    "filter": do_filter,
+    "heart": do_heart,
+    "modal": do_modal,
+    "load_more": do_load_more
+}
+
+# ---------- Sessions ----------
+def run_session(session_id, actions, seed, think_time=0, seen_events=None, seen_lock=None):
+    """
+    One shopper: open the app, then perform random actions
+    Returns the AppTest (kept alive for memory accounting) and the session log
+
+    Args:
+        seen_events: Set of events already expected, shared by all sessions
+        seen_lock: Lock guarding seen_events
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed * 100003 + session_id)
+    app = AppTest.from_file(APP_PATH, default_timeout=RUN_TIMEOUT)
+    # errors: (action, message) for every rerun that raised or showed an exception
+    log = {"latencies": {}, "expected": dict.fromkeys(TRACKED_STATS, 0), "errors": []}
+    if seen_events is None:
+        seen_events = set()
+    if seen_lock is None:
+        seen_lock = threading.Lock()
+
+    def timed_run(name, func):
+        start = time.perf_counter()
+        try:
+            events = func()
+        except Exception as e:
+            log["errors"].append((name, f"{type(e).__name__}: {e}"))
+            return
+        elapsed = time.perf_counter() - start
+        # Failed reruns are left out of the latency numbers
+        if app.exception:
+            log["errors"].extend((name, error.message) for error in app.exception)
+            return
+        log["latencies"].setdefault(name, []).append(elapsed)
+        with seen_lock:
+            for event in events:
+                if event not in seen_events:
+                    seen_events.add(event)
+                    log["expected"][event[0]] += 1
+
+    def open_app():
+        app.run()
+        return []
+
+    timed_run("open", open_app)
+    names = list(ACTIONS)
+    weights = list(ACTIONS.values())
+    for _ in range(actions):
+        if think_time:
+            time.sleep(rng.uniform(0, think_time * 2))
+        name = rng.choices(names, weights=weights)[0]
+        timed_run(name, lambda: ACTION_HANDLERS[name](app, rng))
+    return app, log
+
+def prepare_fixture(work_dir, rows, seed):
+    """Write the catalog fixture and warm the media caches for it"""
+    raw_df = generate_catalog(rows, seed=seed)
+    fixture_path = os.path.join(work_dir, "catalog.csv")
+    raw_df.to_csv(fixture_path, index=False)
+    warm_media_caches(prepare_catalog(raw_df), APP_COLUMNS)
+    return fixture_path
+
+def run_load_test(sessions, concurrency, actions, rows, seed, think_time=0):
+    """Run every session and aggregate latency, throughput, memory and lost writes"""
+    with tempfile.TemporaryDirectory(prefix="asankar-load-") as work_dir, sandbox(work_dir):
+        os.environ[CATALOG_FIXTURE_ENV] = prepare_fixture(work_dir, rows, seed)
+        st.cache_data.clear()
+        before = load_analytics()
+
+        tracemalloc.start()
+        baseline_memory, _ = tracemalloc.get_traced_memory()
+        apps = []
+        logs = []
+        lock = threading.Lock()
+        seen_events = set()
+        seen_lock = threading.Lock()
+
+        def worker(session_id):
+            app, log = run_session(session_id, actions, seed, think_time, seen_events, seen_lock)
+            with lock:
+                apps.append(app)
+                logs.append(log)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(worker, range(sessions)))
+        wall_time = time.perf_counter() - start
+
+        current_memory, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        after = load_analytics()
+        os.environ.pop(CATALOG_FIXTURE_ENV, None)
+
+    latencies = {}
+    for log in logs:
+        for name, samples in log["latencies"].items():
+            latencies.setdefault(name, []).extend(samples)
+    all_samples = [sample for samples in latencies.values() for sample in samples]
+
+    increments = {}
+    for stat in TRACKED_STATS:
+        expected = sum(log["expected"][stat] for log in logs)
+        recorded = after.get(stat, 0) - before.get(stat, 0)
+        increments[stat] = {"expected": expected, "recorded": recorded, "lost": expected - recorded}
+
+    errors = Counter(error for log in logs for error in log["errors"])
+
+    return {
+        "failed": bool(errors),
+        "reruns": len(all_samples),
+        "errors": sum(errors.values()),
+        "error_messages": [
+            {"action": action, "message": message, "count": count}
+            for (action, message), count in errors.most_common()
+        ],
+        "wall_time_s": wall_time,
+        "throughput_reruns_per_s": len(all_samples) / wall_time if wall_time else None,
+        "latency_ms": summarize(all_samples) if all_samples else None,
+        "latency_by_action_ms": {name: summarize(samples) for name, samples in sorted(latencies.items())},
+        "memory": {
+            "per_session_bytes": (current_memory - baseline_memory) / sessions if sessions else 0,
+            "peak_bytes": peak_memory - baseline_memory
+        },
+        "analytics_increments": increments
+    }
+
+# ---------- Output ----------
+def print_report(report):
+    """Human-readable summary of a load test"""
+    latency = report["latency_ms"] or {}
+    print(f"\nReruns: {report['reruns']} in {report['wall_time_s']:.1f}s "
+          f"({report['throughput_reruns_per_s'] or 0:.1f}/s), errors: {report['errors']}")
+    for error in report["error_messages"]:
+        print(f"  ERROR x{error['count']} in {error['action']}: {error['message']}")
+    if latency:
+        print(f"Latency ms: p50 {latency['median']:.1f}  p95 {latency['p95']:.1f}  max {latency['max']:.1f}")
+    for name, stats in report["latency_by_action_ms"].items():
+        print(f"  {name:<10} n={stats['runs']:<5} p50 {stats['median']:8.1f}  p95 {stats['p95']:8.1f}")
+    print(f"Memory per session: {report['memory']['per_session_bytes'] / 1024:.0f} KiB "
+          f"(peak {report['memory']['peak_bytes'] / 1024 / 1024:.1f} MiB)")
+    for stat, counts in report["analytics_increments"].items():
+        print(f"  {stat:<13} expected {counts['expected']:<6} recorded {counts['recorded']:<6} lost {counts['lost']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test of app.py")
+    parser.add_argument("--sessions", type=int, default=20, help="simulated shoppers")
+    parser.add_argument("--concurrency", type=int, default=10, help="sessions running at once")
+    parser.add_argument("--actions", type=int, default=15, help="actions per session after opening the app")
+    parser.add_argument("--rows", type=int, default=2000, help="rows in the catalog fixture")
+    parser.add_argument("--think-time", type=float, default=0, help="mean pause between actions (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON file for the report")
+    args = parser.parse_args(argv)
+
+    output_path = os.path.abspath(args.output)
+    report = run_load_test(args.sessions, args.concurrency, args.actions, args.rows, args.seed, args.think_time)
+    report = {
+        "meta": {"timestamp": datetime.now().isoformat(), "streamlit": st.__version__, **vars(args)},
+        **report
+    }
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print_report(report)
+    print(f"\nReport written to {output_path}")
+    if report["failed"]:
+        print("FAILED: the app raised errors, the timings above only cover successful reruns")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""
+Benchmark the catalog, filter, search, render and analytics paths on
+synthetic catalogs and write the timings to a JSON file
+
+Usage (from the repository root):
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes 1000 10000 --output before.json
+    python -m benchmarks.run --compare before.json
+
+Everything runs in a sandboxed temporary directory: app_data.json and the
+caches of the real app are never touched, and no network requests are made.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+import pandas as pd
+import streamlit as st
+import filters
+import settings
+import similar
+from benchmarks.sandbox import sandbox, warm_media_caches
+from benchmarks.synthetic import generate_catalog, prepare_catalog
+from filters import FACET_COLUMNS, get_facets, filter_products
+from profiler import percentile
+from settings import get_default_app_data, increment_stat
+from similar import ensure_index, get_similar_products
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_OUTPUT = "bench_results.json"
+REGRESSION_THRESHOLD = 1.2  # flag medians that got 20% slower
+
+REPEAT = 20
+RENDER_REPEAT = 5
+INCREMENT_CALLS = 200
+SIMILAR_LOOKUPS = 200
+STATS_SHARE = 0.2  # share of products that already have product_stats
+RENDER_TIMEOUT = 120  # seconds per AppTest run
+
+# Script run by AppTest, the catalog is passed in through session state
+RENDER_SCRIPT = f"""
+import sys
+sys.path.insert(0, {REPO_DIR!r})
+import streamlit as st
+from display import display_products
+
+if "favorites" not in st.session_state:
+    st.session_state.favorites = set()
+display_products(
+    st.session_state.bench_df,
+    st.session_state.bench_language,
+    st.session_state.bench_columns,
+    st.session_state.bench_visible
+)
+"""
+
+# ---------- Timing ----------
+def summarize(samples):
+    """Timing samples (seconds) -> {"runs", "min", "median", "mean", "p95", "max"} in ms"""
+    values = sorted(samples)
+    return {
+        "runs": len(values),
+        "min": values[0] * 1000,
+        "median": percentile(values, 50) * 1000,
+        "mean": sum(values) / len(values) * 1000,
+        "p95": percentile(values, 95) * 1000,
+        "max": values[-1] * 1000
+    }
+
+def time_call(func, repeat=REPEAT, setup=None):
+    """Run func repeat times (setup untimed before each run) and summarize"""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+# ---------- Setup helpers ----------
+def reset_similar_index():
+    """Forget the MinHash/LSH index"""
+    with similar._lock:
+        similar._index["version"] = None
+
+def reset_filter_index():
+    """Forget the facet/search indexes and cached results"""
+    with filters._lock:
+        filters._index["version"] = None
+        filters._results.clear()
+
+def clear_filter_results():
+    """Forget cached filter results but keep the indexes"""
+    with filters._lock:
+        filters._results.clear()
+
+def seed_analytics(df):
+    """Write an app_data.json whose product_stats cover part of the catalog"""
+    data = get_default_app_data()
+    analytics = data["analytics"]
+    analytics["product_id_scheme"] = "stable"
+    step = max(1, round(1 / STATS_SHARE))
+    for product_id in df.index[::step]:
+        analytics["product_stats"][str(product_id)] = {"likes": 1, "views": 3, "clicks": 3, "link_visits": 1}
+    with open(settings.APP_DATA_FILE, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+def get_benchmark_filters(df, language):
+    """The two most common tags and the most common color of the catalog"""
+    tag_col, color_col, _ = FACET_COLUMNS[language]
+    tags = df[tag_col].str.split(", ").explode().value_counts().index
+    colors = df[color_col].str.split(", ").explode().value_counts().index
+    return list(tags[:2]), list(colors[:1])
+
+# ---------- Benchmarks ----------
+def bench_catalog(raw_df):
+    """Per-load preparation: product IDs, index and media columns"""
+    return {"catalog.prepare": time_call(lambda: prepare_catalog(raw_df), repeat=3)}
+
+def bench_facets(df, language):
+    """Facet extraction with a cold index (first load) and a warm one"""
+    return {
+        "facets.cold": time_call(lambda: get_facets(df, language), repeat=3, setup=reset_filter_index),
+        "facets.warm": time_call(lambda: get_facets(df, language))
+    }
+
+def bench_filters(df, language):
+    """Sidebar tag/color filtering, uncached and from the result cache"""
+    tags, colors = get_benchmark_filters(df, language)
+
+    def run():
+        filter_products(df, tags=tags, colors=colors, language=language)
+
+    get_facets(df, language)
+    return {
+        "filter.uncached": time_call(run, setup=clear_filter_results),
+        "filter.cached": time_call(run)
+    }
+
+def bench_search(df, language):
+    """Free-text search (a common tag as query), uncached and cached"""
+    tags, _ = get_benchmark_filters(df, language)
+    query = tags[0]
+
+    def run():
+        filter_products(df, search=query, language=language)
+
+    get_facets(df, language)
+    return {
+        "search.uncached": time_call(run, setup=clear_filter_results),
+        "search.cached": time_call(run)
+    }
+
+def bench_render(df, language, columns_count=3, visible_count=12):
+    """display_products for one page of cards, run through Streamlit's AppTest"""
+    from streamlit.testing.v1 import AppTest
+
+    warm_media_caches(df.head(visible_count), columns_count)
+    first_runs = []
+    reruns = []
+    for _ in range(RENDER_REPEAT):
+        app = AppTest.from_string(RENDER_SCRIPT, default_timeout=RENDER_TIMEOUT)
+        app.session_state["bench_df"] = df
+        app.session_state["bench_language"] = language
+        app.session_state["bench_columns"] = columns_count
+        app.session_state["bench_visible"] = visible_count
+
+        start = time.perf_counter()
+        app.run()
+        first_runs.append(time.perf_counter() - start)
+        if app.exception:
+            raise RuntimeError(f"display_products failed: {app.exception[0].message}")
+
+        start = time.perf_counter()
+        app.run()
+        reruns.append(time.perf_counter() - start)
+
+    return {
+        "render.first_run": summarize(first_runs),
+        "render.rerun": summarize(reruns)
+    }
+
+def bench_increment_stat(df):
+    """increment_stat calls per second against a seeded app_data.json"""
+    seed_analytics(df)
+    product_ids = list(df.index[:INCREMENT_CALLS])
+    calls = iter(product_ids)
+
+    def run():
+        increment_stat("total_views", product_id=next(calls))
+
+    result = time_call(run, repeat=len(product_ids))
+    result["ops_per_sec"] = 1000 / result["mean"] if result["mean"] else None
+    return {"analytics.increment_stat": result}
+
+def bench_similar(df):
+    """Similar-product index build and lookups for products spread over the catalog"""
+    step = max(1, len(df) // SIMILAR_LOOKUPS)
+    product_ids = list(df.index[::step][:SIMILAR_LOOKUPS])
+    lookups = iter(product_ids)
+
+    def run():
+        get_similar_products(df, next(lookups))
+
+    build = time_call(lambda: ensure_index(df), repeat=3, setup=reset_similar_index)
+    ensure_index(df)
+    return {
+        "similar.build": build,
+        "similar.lookup": time_call(run, repeat=len(product_ids))
+    }
+
+def run_size(rows, language, seed):
+    """Every benchmark for one catalog size"""
+    print(f"[{rows} rows] generating catalog", flush=True)
+    raw_df = generate_catalog(rows, seed=seed)
+    results = bench_catalog(raw_df)
+    df = prepare_catalog(raw_df)
+    reset_filter_index()
+
+    for name, bench in [
+        ("facets", lambda: bench_facets(df, language)),
+        ("filter", lambda: bench_filters(df, language)),
+        ("search", lambda: bench_search(df, language)),
+        ("render", lambda: bench_render(df, language)),
+        ("similar", lambda: bench_similar(df)),
+        ("increment_stat", lambda: bench_increment_stat(df))
+    ]:
+        print(f"[{rows} rows] {name}", flush=True)
+        results.update(bench())
+    return results
+
+# ---------- Output ----------
+def get_metadata(args):
+    """Environment details stored with the results"""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pandas": pd.__version__,
+        "streamlit": st.__version__,
+        "language": args.language,
+        "seed": args.seed,
+        "sizes": args.sizes
+    }
+
+def compare_results(current, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Median ratios of current vs baseline for every shared benchmark
+    Returns a list of (size, name, baseline ms, current ms, ratio, regressed)
+    """
+    rows = []
+    for size, benchmarks in current["results"].items():
+        for name, stats in benchmarks.items():
+            old = baseline.get("results", {}).get(size, {}).get(name)
+            if not old or not old.get("median"):
+                continue
+            ratio = stats["median"] / old["median"]
+            rows.append((size, name, old["median"], stats["median"], ratio, ratio > threshold))
+    return rows
+
+def print_results(results):
+    """Median timings as a plain text table"""
+    for size, benchmarks in results["results"].items():
+        print(f"\n{size} rows")
+        for name, stats in benchmarks.items():
+            print(f"  {name:<28} median {stats['median']:10.3f} ms   p95 {stats['p95']:10.3f} ms")
+
+def print_comparison(rows, threshold=REGRESSION_THRESHOLD):
+    """Baseline comparison as a plain text table, returns the regression count"""
+    print(f"\nComparison (regression = median more than {threshold:.0%} of baseline)")
+    for size, name, old, new, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"  {size:>7} {name:<28} {old:10.3f} -> {new:10.3f} ms  x{ratio:5.2f}{flag}")
+    return sum(1 for row in rows if row[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the app on synthetic catalogs")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="catalog row counts")
+    parser.add_argument("--language", choices=sorted(FACET_COLUMNS), default="Kurdish")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON file for the results")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    output_path = os.path.abspath(args.output)
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {"meta": get_metadata(args), "results": {}}
+    with tempfile.TemporaryDirectory(prefix="asankar-bench-") as work_dir, sandbox(work_dir):
+        for rows in args.sizes:
+            results["results"][str(rows)] = run_size(rows, args.language, args.seed)
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print_results(results)
+    print(f"\nResults written to {output_path}")
+
+    if baseline is not None:
+        regressions = print_comparison(compare_results(results, baseline))
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
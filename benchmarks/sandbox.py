@@ -0,0 +1,88 @@
+import base64
+import io
+import os
+import time
+from contextlib import contextmanager
+from PIL import Image
+import catalog
+import link_health
+import placeholders
+import settings
+import thumbnails
+import visitors
+from catalog import get_media_check_urls, get_youtube_thumbnail_url
+from thumbnails import get_thumbnail_name, get_thumbnail_width, get_url_key
+
+# Every file the app writes: (module, attribute, name inside the sandbox)
+STATE_PATHS = [
+    (settings, "APP_DATA_FILE", "app_data.json"),
+    (visitors, "SKETCH_FILE", "analytics_sketches.json"),
+    (catalog, "CATALOG_STATE_FILE", os.path.join(".cache", "catalog_state.json")),
+    (placeholders, "PLACEHOLDER_FILE", os.path.join(".cache", "placeholders.json")),
+    (link_health, "HEALTH_FILE", os.path.join(".cache", "link_health.json")),
+    (thumbnails, "ORIGINALS_DIR", os.path.join(".cache", "originals")),
+    (thumbnails, "THUMBNAILS_DIR", "thumbs")
+]
+
+# In-memory copies of those files, reloaded from the sandbox on next use
+STATE_CACHES = [
+    (placeholders, "_placeholders"),
+    (link_health, "_health"),
+    (thumbnails, "_cache_bytes"),
+    (visitors, "_sketches")
+]
+
+# ---------- Sandbox ----------
+@contextmanager
+def sandbox(work_dir):
+    """
+    Point every file the app reads and writes at work_dir, so benchmarks
+    never touch the real analytics, caches or thumbnails
+    """
+    saved = [(module, name, getattr(module, name)) for module, name, _ in STATE_PATHS]
+    saved += [(module, name, getattr(module, name)) for module, name in STATE_CACHES]
+    try:
+        for module, name, relative in STATE_PATHS:
+            setattr(module, name, os.path.join(work_dir, relative))
+        for module, name in STATE_CACHES:
+            setattr(module, name, None)
+        yield work_dir
+    finally:
+        for module, name, value in saved:
+            setattr(module, name, value)
+
+# ---------- Warm caches ----------
+def encode_image(fmt):
+    """A tiny real image, so st.image and browsers accept the stand-ins"""
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4), (200, 200, 200)).save(buffer, fmt)
+    return buffer.getvalue()
+
+def warm_media_caches(df, columns_count=3):
+    """
+    Fill the sandbox caches as a long-running server would have them:
+    thumbnails for every image and video, a placeholder for every image and
+    a fresh "ok" health result for every media URL. Nothing is downloaded.
+    """
+    width = get_thumbnail_width(columns_count)
+    variants = {"webp": encode_image("WEBP"), "jpg": encode_image("JPEG")}
+    lqip = "data:image/jpeg;base64," + base64.b64encode(variants["jpg"]).decode("ascii")
+
+    os.makedirs(thumbnails.THUMBNAILS_DIR, exist_ok=True)
+    store = placeholders.load_placeholders()
+    for url, media_type, youtube_id in zip(df["_url"], df["_media_type"], df["_youtube_id"]):
+        if media_type == "image":
+            store[get_url_key(url)] = {"lqip": lqip, "aspect_ratio": 1.0}
+        elif media_type == "youtube":
+            url = get_youtube_thumbnail_url(youtube_id)
+        else:
+            continue
+        for fmt, data in variants.items():
+            with open(os.path.join(thumbnails.THUMBNAILS_DIR, get_thumbnail_name(url, width, fmt)), "wb") as f:
+                f.write(data)
+    placeholders.save_placeholders()
+
+    now = time.time()
+    health = link_health.load_health()
+    health.update({url: {"ok": True, "status": 200, "checked_at": now} for url in get_media_check_urls(df)})
+    link_health.save_health()
@@ -0,0 +1,119 @@
+import hashlib
+import random
+import pandas as pd
+from catalog import assign_product_ids, attach_media_columns
+
+# Parallel vocabularies: (Kurdish, Arabic) for the same value, most common first
+TAGS = [
+    ("ملوانکە", "قلادة"), ("ئەنگوستیلە", "خاتم"), ("گوارە", "حلق"), ("بازن", "سوار"),
+    ("دەستبەند", "اسوارة"), ("سەرپۆش", "غطاء رأس"), ("جانتا", "حقيبة"), ("کەمەر", "حزام"),
+    ("کاتژمێر", "ساعة"), ("تاج", "تاج"), ("بەرۆک", "بروش"), ("خشڵی قژ", "اكسسوار شعر"),
+    ("پاوانە", "خلخال"), ("زنجیر", "سلسلة"), ("دوگمە", "زر"), ("کلیل", "ميدالية")
+]
+COLORS = [
+    ("زێڕین", "ذهبي"), ("زیوی", "فضي"), ("ڕەش", "أسود"), ("سپی", "أبيض"), ("سوور", "أحمر"),
+    ("شین", "أزرق"), ("سەوز", "أخضر"), ("پەمەیی", "وردي"), ("مۆر", "بنفسجي"),
+    ("قاوەیی", "بني"), ("پرتەقاڵی", "برتقالي"), ("زەرد", "أصفر")
+]
+MATERIALS = [
+    ("زێڕ", "ذهب"), ("زیو", "فضة"), ("مس", "نحاس"), ("پۆڵا", "فولاذ"), ("مرواری", "لؤلؤ"),
+    ("چەرم", "جلد"), ("دار", "خشب"), ("شووشە", "زجاج"), ("بەرد", "حجر"), ("قوماش", "قماش")
+]
+
+# Share of each kind of URL in the sheet
+URL_KINDS = [
+    ("image", 0.60),
+    ("youtube", 0.25),
+    ("image_invalid", 0.04),
+    ("youtube_invalid", 0.03),
+    ("other", 0.04),
+    ("none", 0.04)
+]
+IMAGE_EXTENSIONS = ["jpg", "jpeg", "png", "webp"]
+
+# ---------- Value distributions ----------
+def zipf_weights(count, exponent=1.1):
+    """Long-tail weights: a few values are common, most are rare"""
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+def pick_values(rng, vocabulary, weights, low, high):
+    """Draw between low and high distinct entries of a vocabulary"""
+    count = rng.randint(low, high)
+    picked = []
+    while len(picked) < count:
+        value = rng.choices(vocabulary, weights=weights)[0]
+        if value not in picked:
+            picked.append(value)
+    return picked
+
+def make_youtube_id(rng):
+    """Random 11 character video ID"""
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+    return "".join(rng.choice(alphabet) for _ in range(11))
+
+def make_url(rng, row_number):
+    """Media URL of a random kind, formatted the way sheet editors paste them"""
+    kind = rng.choices([k for k, _ in URL_KINDS], weights=[w for _, w in URL_KINDS])[0]
+    stem = hashlib.sha1(str(row_number).encode("utf-8")).hexdigest()[:16]
+
+    if kind == "image":
+        return f"https://cdn.example.com/products/{stem}.{rng.choice(IMAGE_EXTENSIONS)}"
+    if kind == "youtube":
+        video_id = make_youtube_id(rng)
+        return rng.choice([
+            f"https://www.youtube.com/watch?v={video_id}",
+            f"https://youtu.be/{video_id}",
+            f"https://www.youtube.com/embed/{video_id}",
+            f"https://www.youtube.com/watch?v={video_id}&t=42s"
+        ])
+    if kind == "image_invalid":
+        return f"cdn.example.com/products/{stem}.jpg"
+    if kind == "youtube_invalid":
+        return "https://www.youtube.com/channel/example"
+    if kind == "other":
+        return f"https://shop.example.com/p/{stem}"
+    return ""
+
+# ---------- Catalogs ----------
+def generate_catalog(rows, seed=0):
+    """
+    Synthetic product sheet with the same columns as the Google Sheet
+    Each row has Kurdish and Arabic tag/color/material cells (comma separated,
+    long-tailed) and a media URL. Same rows and seed -> same catalog.
+    """
+    rng = random.Random(seed)
+    tag_weights = zipf_weights(len(TAGS))
+    color_weights = zipf_weights(len(COLORS))
+    material_weights = zipf_weights(len(MATERIALS))
+
+    records = []
+    for row_number in range(rows):
+        tags = pick_values(rng, TAGS, tag_weights, 1, 3)
+        colors = pick_values(rng, COLORS, color_weights, 1, 2)
+        materials = pick_values(rng, MATERIALS, material_weights, 1, 2)
+        records.append({
+            "URL": make_url(rng, row_number),
+            "بابەتی": ", ".join(ku for ku, _ in tags),
+            "ڕەنگی": ", ".join(ku for ku, _ in colors),
+            "پێکهاتەی": ", ".join(ku for ku, _ in materials),
+            "عنصر": ", ".join(ar for _, ar in tags),
+            "الالوان": ", ".join(ar for _, ar in colors),
+            "مكون من": ", ".join(ar for _, ar in materials),
+            "Price": rng.randint(5, 500) * 1000
+        })
+    return pd.DataFrame(records)
+
+def prepare_catalog(df):
+    """
+    Apply the per-load steps of catalog.load_catalog that do not touch the
+    network: product IDs, the ID index and media columns
+    Sets df.attrs["catalog_version"] from the row contents
+    """
+    df = df.copy()
+    assign_product_ids(df)
+    df = df.set_index("_product_id", drop=False)
+    df.index.name = "product_id"
+    attach_media_columns(df)
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df["_product_id"], index=False).values.tobytes())
+    df.attrs["catalog_version"] = f"synthetic-{digest.hexdigest()[:12]}"
+    return df
@@ -0,0 +1,270 @@
+import hashlib
+import json
+import os
+import pandas as pd
+import streamlit as st
+from settings import load_google_sheet, migrate_product_stats
+from placeholders import get_placeholder, needs_precompute, schedule_precompute
+from link_health import schedule_health_check, forget_urls
+from thumbnails import evict_url
+from placeholders import forget_placeholders
+from filters import update_index
+import similar
+from metrics import mark_cache_miss
+
+# Columns added by the app start with this prefix and are hidden from users
+DERIVED_PREFIX = "_"
+
+IMAGE_URL_PATTERN = r"\.(?:jpg|jpeg|png|webp|gif|bmp|svg)$"
+VALID_URL_PATTERN = r"^[A-Za-z][A-Za-z0-9+.-]*://[^/?#\s]+"
+YOUTUBE_PATTERN = r"youtube\.com|youtu\.be"
+YOUTUBE_ID_PATTERNS = [
+    r"(?i:youtu\.be)/([^/?&#]+)",
+    r"[?&]v=([^&#]+)",
+    r"(?i:embed)/([^/?&#]+)"
+]
+
+# Row hashes of the last loaded version, used to diff the next one
+CATALOG_STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "catalog_state.json")
+
+# An explicit ID column wins, otherwise IDs are hashed from these fields
+ID_COLUMNS = ["ID", "Id", "id", "Product ID", "product_id", "SKU"]
+ID_KEY_FIELDS = ["URL", "بابەتی", "عنصر"]
+ID_LENGTH = 12
+
+MEDIA_TYPE_LABELS = {
+    "image": "🖼️ Image",
+    "youtube": "▶️ Video",
+    "image_invalid": "⚠️ Invalid image",
+    "youtube_invalid": "⚠️ Invalid video",
+    "other": "ℹ️ Other",
+    "none": "🚫 No media"
+}
+
+# ---------- Catalog snapshot ----------
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_catalog():
+    """
+    Load the product sheet and attach precomputed per-product data
+    Returns: DataFrame with the sheet columns plus derived '_' columns
+    """
+    mark_cache_miss()
+    df = load_google_sheet()
+    if df.empty:
+        return df
+
+    df = df.copy()
+    assign_product_ids(df)
+    df = df.set_index("_product_id", drop=False)
+    df.index.name = "product_id"
+    attach_media_columns(df)
+
+    # Version the snapshot and only invalidate what changed since last load
+    diff = record_catalog_version(df)
+    apply_catalog_diff(df, diff)
+
+    attach_placeholders(df)
+    schedule_health_check(get_media_check_urls(df))
+    return df
+
+def get_product(product_id):
+    """
+    Look up one product row by ID in the shared cached catalog
+    Returns None if the product is no longer in the sheet
+    """
+    df = load_catalog()
+    if df.empty or product_id not in df.index:
+        return None
+    return df.loc[product_id]
+
+def get_display_columns(df):
+    """Sheet columns only, without the derived '_' columns"""
+    return [col for col in df.columns if not str(col).startswith(DERIVED_PREFIX)]
+
+# ---------- Product IDs ----------
+def hash_product_id(row):
+    """Content-derived ID from the URL and name fields of a row"""
+    key = "|".join(str(row.get(field, "")).strip() for field in ID_KEY_FIELDS)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:ID_LENGTH]
+
+def assign_product_ids(df):
+    """
+    Add a '_product_id' column that survives reordering of the sheet
+    Uses the first ID column if present, otherwise a hash of key fields.
+    Duplicates get a -2, -3... suffix in sheet order.
+    Existing product_stats (keyed by row position) are remapped once.
+    """
+    id_column = next((col for col in ID_COLUMNS if col in df.columns), None)
+
+    ids = []
+    seen = {}
+    for _, row in df.iterrows():
+        explicit = str(row.get(id_column, "")).strip() if id_column else ""
+        product_id = explicit if explicit and explicit.lower() != "nan" else hash_product_id(row)
+        count = seen.get(product_id, 0) + 1
+        seen[product_id] = count
+        ids.append(product_id if count == 1 else f"{product_id}-{count}")
+
+    # Stats used to be keyed by the positional DataFrame index
+    migrate_product_stats(dict(zip(map(str, df.index), ids)))
+
+    df["_product_id"] = ids
+
+# ---------- Versioning ----------
+def hash_row(row, columns):
+    """Hash of a row's sheet fields, changes whenever any of them is edited"""
+    text = "\x1f".join(str(row[col]) for col in columns)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+def load_catalog_state():
+    """Previous version info: {"version", "rows": {id: [row_hash, url]}}"""
+    try:
+        with open(CATALOG_STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"version": None, "rows": {}}
+
+def save_catalog_state(state):
+    """Persist version info for the next diff"""
+    os.makedirs(os.path.dirname(CATALOG_STATE_FILE), exist_ok=True)
+    tmp_path = f"{CATALOG_STATE_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, CATALOG_STATE_FILE)
+
+def diff_rows(old_rows, new_rows):
+    """Row-level diff of two {id: [row_hash, url]} maps"""
+    return {
+        "added": sorted(set(new_rows) - set(old_rows)),
+        "removed": sorted(set(old_rows) - set(new_rows)),
+        "changed": sorted(
+            pid for pid in set(old_rows) & set(new_rows)
+            if old_rows[pid][0] != new_rows[pid][0]
+        )
+    }
+
+def record_catalog_version(df):
+    """
+    Assign the catalog a content version and diff it against the last one
+    The version is stored in df.attrs["catalog_version"]
+    Returns the diff, with "from_version"/"to_version" and the previous rows
+    """
+    columns = get_display_columns(df)
+    rows = {
+        pid: [hash_row(row, columns), url]
+        for (pid, row), url in zip(df.iterrows(), df["_url"])
+    }
+    version = hashlib.sha1(
+        json.dumps(sorted((pid, value[0]) for pid, value in rows.items())).encode("utf-8")
+    ).hexdigest()[:12]
+    df.attrs["catalog_version"] = version
+
+    previous = load_catalog_state()
+    diff = diff_rows(previous.get("rows", {}), rows)
+    diff["from_version"] = previous.get("version")
+    diff["to_version"] = version
+    diff["previous_rows"] = previous.get("rows", {})
+
+    if previous.get("version") != version:
+        save_catalog_state({"version": version, "rows": rows})
+    return diff
+
+def get_catalog_version(df):
+    """Content version of a loaded catalog, or None"""
+    return df.attrs.get("catalog_version")
+
+def apply_catalog_diff(df, diff):
+    """
+    Update or evict derived data for products that changed
+    Media caches are only dropped for URLs that were removed or replaced
+    """
+    previous_rows = diff["previous_rows"]
+    stale_urls = set()
+    for pid in diff["removed"] + diff["changed"]:
+        old_url = previous_rows[pid][1]
+        if old_url and (pid not in df.index or df.at[pid, "_url"] != old_url):
+            stale_urls.add(old_url)
+
+    # Old URLs still used by another product stay cached
+    stale_urls -= set(df["_url"])
+    if stale_urls:
+        for url in stale_urls:
+            evict_url(url)
+        forget_placeholders(stale_urls)
+        forget_urls(stale_urls)
+
+    update_index(df, diff["to_version"], diff)
+    similar.update_index(df, diff["to_version"], diff)
+
+# ---------- Media classification ----------
+def attach_media_columns(df):
+    """
+    Classify every product URL once, with vectorized string operations
+    Adds '_url' (stripped), '_media_type', '_youtube_id' and '_url_valid',
+    matching display.classify_media row by row
+    """
+    if "URL" in df.columns:
+        url = df["URL"].fillna("").astype(str).str.strip()
+    else:
+        url = pd.Series("", index=df.index, dtype=object)
+
+    lower = url.str.lower()
+    has_url = url != ""
+    url_valid = url.str.contains(VALID_URL_PATTERN, regex=True)
+    is_youtube = lower.str.contains(YOUTUBE_PATTERN, regex=True)
+    is_image = lower.str.contains(IMAGE_URL_PATTERN, regex=True)
+
+    youtube_id = pd.Series(pd.NA, index=df.index, dtype=object)
+    for pattern in YOUTUBE_ID_PATTERNS:
+        youtube_id = youtube_id.fillna(url.str.extract(pattern, expand=False))
+    youtube_id = youtube_id.where(is_youtube)
+
+    media_type = pd.Series("other", index=df.index, dtype=object)
+    media_type[~has_url] = "none"
+    media_type[is_image & url_valid] = "image"
+    media_type[is_image & ~url_valid] = "image_invalid"
+    media_type[is_youtube & youtube_id.notna()] = "youtube"
+    media_type[is_youtube & youtube_id.isna()] = "youtube_invalid"
+
+    df["_url"] = url
+    df["_media_type"] = media_type
+    df["_youtube_id"] = youtube_id.astype(object).where(youtube_id.notna(), None)
+    df["_url_valid"] = url_valid
+
+def get_media_check_urls(df):
+    """URLs the link health checker should probe for every product's media"""
+    images = df.loc[df["_media_type"] == "image", "_url"]
+    videos = df.loc[df["_media_type"] == "youtube", "_youtube_id"]
+    return list(images) + [get_youtube_thumbnail_url(video_id) for video_id in videos]
+
+def get_youtube_thumbnail_url(video_id):
+    """Still image YouTube publishes for every video"""
+    return f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+
+# ---------- Image placeholders ----------
+def attach_placeholders(df):
+    """
+    Add '_lqip' (blurred preview data URI) and '_aspect_ratio' columns
+    Images without a stored placeholder are computed in the background;
+    renderers read them from the store through get_row_placeholder() as soon
+    as they exist, without waiting for the cached catalog to reload. Recent
+    failures are not retried
+    """
+    lqips = []
+    aspect_ratios = []
+    missing = []
+
+    for url, media_type in zip(df["_url"], df["_media_type"]):
+        placeholder = None
+        if media_type == "image":
+            placeholder = get_placeholder(url)
+            if placeholder is None and needs_precompute(url):
+                missing.append(url)
+        lqips.append(placeholder["lqip"] if placeholder else None)
+        aspect_ratios.append(placeholder["aspect_ratio"] if placeholder else None)
+
+    df["_lqip"] = lqips
+    df["_aspect_ratio"] = aspect_ratios
+
+    if missing:
+        schedule_precompute(missing)
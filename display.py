@@ -1,10 +1,123 @@
 import streamlit as st
+import html
+import os
 import re
 from urllib.parse import urlparse
-from settings import increment_stat, get_product_stats
+from settings import increment_stat, increment_stats, get_product_stats, get_analytics_totals
+from styles import register_style
+from thumbnails import get_thumbnail, get_thumbnail_urls, MODAL_COLUMNS
+from placeholders import get_row_placeholder
+from link_health import is_broken
+from catalog import load_catalog, get_product, get_youtube_thumbnail_url
+from similar import get_similar_products
+from profiler import timed
+from visitors import VISIT_STAT, get_unique_count
 
 FALLBACK_LOGO = "fallback_logo.png"
 
+# ----------------- Card Styles -----------------
+register_style("display.card", """
+<style>
+    /* Media box sized before the image arrives, blurred preview behind it */
+    .product-media {
+        width: 100%;
+        border-radius: 8px;
+        overflow: hidden;
+        background-size: cover;
+        background-position: center;
+    }
+    
+    .product-media img {
+        width: 100%;
+        height: 100%;
+        object-fit: cover;
+        display: block;
+    }
+    
+    /* YouTube facade: thumbnail with a play badge until the player is requested */
+    .video-facade {
+        position: relative;
+        aspect-ratio: 16 / 9;
+        border-radius: 8px;
+        overflow: hidden;
+        background: #000;
+    }
+    
+    .video-facade img {
+        width: 100%;
+        height: 100%;
+        object-fit: cover;
+        display: block;
+    }
+    
+    .video-facade .play-badge {
+        position: absolute;
+        top: 50%;
+        left: 50%;
+        transform: translate(-50%, -50%);
+        width: 68px;
+        height: 48px;
+        border-radius: 12px;
+        background: rgba(255, 0, 0, 0.85);
+        color: white;
+        font-size: 1.5rem;
+        line-height: 48px;
+        text-align: center;
+    }
+    
+    /* Product details box */
+    .product-details {
+        background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
+        padding: 1rem;
+        border-radius: 8px;
+        margin: 0.5rem 0;
+    }
+    
+    .product-details p {
+        margin: 0.3rem 0;
+        font-size: 0.9rem;
+    }
+    
+    /* Product stats badge */
+    .product-stats-mobile {
+        display: flex;
+        flex-direction: row;
+        justify-content: center;
+        align-items: center;
+        gap: 0.5rem;
+        margin: 0.5rem 0;
+        padding: 0.3rem;
+        font-size: 0.85rem;
+        color: #666;
+        flex-wrap: nowrap;
+        white-space: nowrap;
+    }
+    
+    /* Force card buttons to stay in one row on mobile */
+    div[data-testid="column"] {
+        flex: 1 1 33% !important;
+        min-width: 0 !important;
+        padding: 0 0.2rem !important;
+    }
+    
+    /* Mobile-specific button styling */
+    @media (max-width: 768px) {
+        .stButton > button {
+            width: 100% !important;
+            padding: 0.5rem 0.2rem !important;
+            font-size: 1.3rem !important;
+            min-width: 0 !important;
+        }
+        
+        div[data-testid="column"] {
+            flex: 1 1 33% !important;
+            max-width: 33.33% !important;
+            min-width: 30% !important;
+        }
+    }
+</style>
+""")
+
 # ----------------- Media Detection Helpers -----------------
 def is_youtube(url: str) -> bool:
     """Check if URL is a YouTube video"""
@@ -41,12 +154,132 @@ def is_valid_url(url: str) -> bool:
     except:
         return False
 
+def classify_media(url) -> dict:
+    """
+    Classify a media URL the same way the catalog's derived columns do
+    media_type is one of: youtube, youtube_invalid, image, image_invalid,
+    other, none
+    """
+    url = url.strip() if isinstance(url, str) else ""
+    if not url:
+        return {"url": "", "media_type": "none", "youtube_id": None, "url_valid": False}
+
+    url_valid = is_valid_url(url)
+    youtube_id = None
+    if is_youtube(url):
+        youtube_id = extract_youtube_id(url) or None
+        media_type = "youtube" if youtube_id else "youtube_invalid"
+    elif is_image(url):
+        media_type = "image" if url_valid else "image_invalid"
+    else:
+        media_type = "other"
+
+    return {"url": url, "media_type": media_type, "youtube_id": youtube_id, "url_valid": url_valid}
+
+def get_media_info(row) -> dict:
+    """Read the precomputed media columns, classifying on the fly if absent"""
+    if "_media_type" not in row:
+        return classify_media(row.get("URL", ""))
+    youtube_id = row.get("_youtube_id")
+    return {
+        "url": row.get("_url", ""),
+        "media_type": row["_media_type"],
+        "youtube_id": youtube_id if isinstance(youtube_id, str) else None,
+        "url_valid": bool(row.get("_url_valid", False))
+    }
+
+def get_media_check_url(media):
+    """
+    URL the health checker probes for a media item
+    YouTube watch pages load even for deleted videos, the still image does not
+    """
+    if media["media_type"] == "youtube":
+        return get_youtube_thumbnail_url(media["youtube_id"])
+    if media["media_type"] == "image":
+        return media["url"]
+    return None
+
+def is_media_broken(media):
+    """Whether the health checker has recently seen this media fail"""
+    check_url = get_media_check_url(media)
+    return bool(check_url) and is_broken(check_url)
+
+# ----------------- Image With Placeholder -----------------
+def render_image_with_placeholder(url, placeholder, columns_count=3):
+    """
+    Render an image in a box that already has the right size and a blurred
+    preview, so the card does not shift when the real image loads
+    """
+    thumbnail = get_thumbnail_urls(url, columns_count)
+    src = html.escape(thumbnail["webp"] if thumbnail else url, quote=True)
+    st.markdown(f"""
+    <div class="product-media" style="aspect-ratio: {float(placeholder['aspect_ratio'])}; background-image: url('{placeholder['lqip']}');">
+        <img src="{src}" loading="lazy" alt="">
+    </div>
+    """, unsafe_allow_html=True)
+
+# ----------------- YouTube Facade -----------------
+MODAL_VIDEO_PREFIX = "modal_"
+
+def stop_modal_videos():
+    """Forget which dialog videos were playing, so the next dialog shows the facade"""
+    playing = st.session_state.get("playing_videos")
+    if playing:
+        playing.difference_update([key for key in playing if key.startswith(MODAL_VIDEO_PREFIX)])
+
+def render_youtube_media(video_id, key, columns_count=3):
+    """
+    Show a cached thumbnail with a play badge instead of the YouTube player
+    The player iframe is only loaded after the play button is clicked
+    """
+    if "playing_videos" not in st.session_state:
+        st.session_state.playing_videos = set()
+
+    if key in st.session_state.playing_videos:
+        st.video(f"https://www.youtube.com/embed/{video_id}")
+        return
+
+    thumbnail_url = get_youtube_thumbnail_url(video_id)
+    thumbnail = get_thumbnail_urls(thumbnail_url, columns_count)
+    src = html.escape(thumbnail["webp"] if thumbnail else thumbnail_url, quote=True)
+    st.markdown(f"""
+    <div class="video-facade">
+        <img src="{src}" loading="lazy" alt="">
+        <span class="play-badge">▶</span>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # The click reruns only the card or dialog fragment; the callback runs first
+    st.button("▶️ Play", key=f"play_{key}", use_container_width=True,
+              on_click=st.session_state.playing_videos.add, args=(key,))
+
 # ----------------- Product Card Component -----------------
-def render_product_card(row, idx, language="Kurdish"):
+def select_product(product_id):
+    """View button callback: pick the product app.py shows in the dialog"""
+    # Only the ID is kept, the dialog looks the row up in the catalog
+    st.session_state.selected_product_id = product_id
+    stop_modal_videos()
+    # Track view and click in one write
+    increment_stats({"total_views": 1, "total_clicks": 1}, product_ids=product_id)
+
+def toggle_favorite(product_id):
+    """Heart button callback: add/remove a favorite, counting new likes"""
+    if product_id in st.session_state.favorites:
+        st.session_state.favorites.remove(product_id)
+    else:
+        st.session_state.favorites.add(product_id)
+        increment_stat("total_likes", product_id=product_id)
+
+@st.fragment
+@timed("display.render_product_card")
+def render_product_card(row, idx, language="Kurdish", columns_count=3):
     """
     Render a single product card with media, details, and interaction buttons
     Tracks all user interactions
     Mobile-optimized with inline stats and buttons
+
+    Runs as a fragment: clicking a card button reruns only this card,
+    not the whole app script.
     """
     # Get language-specific labels
     if language == "Kurdish":
@@ -62,7 +295,9 @@ def render_product_card(row, idx, language="Kurdish"):
     tags = row.get(tag_label, "N/A")
     colors = row.get(color_label, "N/A")
     materials = row.get(material_label, "N/A")
-    url = row.get("URL", "")
+    media = get_media_info(row)
+    url = media["url"]
+    media_type = media["media_type"]
     
     # Get product stats
     product_stats = get_product_stats(idx)
@@ -73,23 +308,32 @@ def render_product_card(row, idx, language="Kurdish"):
         media_success = False
         
         try:
-            if is_youtube(url):
-                video_id = extract_youtube_id(url)
-                if video_id:
-                    embed_url = f"https://www.youtube.com/embed/{video_id}"
-                    st.video(embed_url)
-                    media_success = True
-                else:
-                    st.warning("⚠️ Invalid YouTube URL")
+            if is_media_broken(media):
+                # Known dead link: skip the fetch and show the fallback logo
+                st.image(FALLBACK_LOGO, use_container_width=True)
+                st.caption("⚠️ Media unavailable")
             
-            elif is_image(url):
-                if is_valid_url(url):
-                    st.image(url, use_container_width=True)
-                    media_success = True
+            elif media_type == "youtube":
+                render_youtube_media(media["youtube_id"], f"card_{idx}", columns_count)
+                media_success = True
+            
+            elif media_type == "youtube_invalid":
+                st.warning("⚠️ Invalid YouTube URL")
+            
+            elif media_type == "image":
+                placeholder = get_row_placeholder(row, url)
+                if placeholder:
+                    render_image_with_placeholder(url, placeholder, columns_count)
                 else:
-                    st.warning("⚠️ Invalid image URL")
+                    # Serve a thumbnail sized for the grid, fall back to the original
+                    thumbnail = get_thumbnail(url, columns_count)
+                    st.image(thumbnail or url, use_container_width=True)
+                media_success = True
+            
+            elif media_type == "image_invalid":
+                st.warning("⚠️ Invalid image URL")
             
-            elif url:
+            elif media_type == "other":
                 st.info("ℹ️ Unsupported media type")
             else:
                 st.warning("⚠️ No media URL provided")
@@ -99,21 +343,10 @@ def render_product_card(row, idx, language="Kurdish"):
         
         # Product details with better formatting
         st.markdown(f"""
-        <div style='
-            background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
-            padding: 1rem;
-            border-radius: 8px;
-            margin: 0.5rem 0;
-        '>
-            <p style='margin: 0.3rem 0; font-size: 0.9rem;'>
-                <strong>{tag_label}:</strong> {tags}
-            </p>
-            <p style='margin: 0.3rem 0; font-size: 0.9rem;'>
-                <strong>{color_label}:</strong> {colors}
-            </p>
-            <p style='margin: 0.3rem 0; font-size: 0.9rem;'>
-                <strong>{material_label}:</strong> {materials}
-            </p>
+        <div class="product-details">
+            <p><strong>{tag_label}:</strong> {tags}</p>
+            <p><strong>{color_label}:</strong> {colors}</p>
+            <p><strong>{material_label}:</strong> {materials}</p>
         </div>
         """, unsafe_allow_html=True)
         
@@ -131,81 +364,36 @@ def render_product_card(row, idx, language="Kurdish"):
                 # Use pure HTML with flexbox - guaranteed to work on mobile
                 stats_display = " • ".join(stats_parts)
                 st.markdown(f"""
-                <div style="
-                    display: flex;
-                    flex-direction: row;
-                    justify-content: center;
-                    align-items: center;
-                    gap: 0.5rem;
-                    margin: 0.5rem 0;
-                    padding: 0.3rem;
-                    font-size: 0.85rem;
-                    color: #666;
-                    flex-wrap: nowrap;
-                    white-space: nowrap;
-                ">
+                <div class="product-stats-mobile">
                     <span>{stats_display}</span>
                 </div>
                 """, unsafe_allow_html=True)
         
-        # Action buttons - FORCE HORIZONTAL ON MOBILE
-        # Using HTML buttons instead of Streamlit for better mobile control
-        st.markdown("""
-        <style>
-            /* Force buttons to stay in one row on mobile */
-            div[data-testid="column"] {
-                flex: 1 1 33% !important;
-                min-width: 0 !important;
-                padding: 0 0.2rem !important;
-            }
-            
-            /* Mobile-specific button styling */
-            @media (max-width: 768px) {
-                .stButton > button {
-                    width: 100% !important;
-                    padding: 0.5rem 0.2rem !important;
-                    font-size: 1.3rem !important;
-                    min-width: 0 !important;
-                }
-                
-                div[data-testid="column"] {
-                    flex: 1 1 33% !important;
-                    max-width: 33.33% !important;
-                    min-width: 30% !important;
-                }
-            }
-        </style>
-        """, unsafe_allow_html=True)
-        
+        # Action buttons - horizontal layout comes from the shared stylesheet
         col1, col2, col3 = st.columns(3)
         
         with col1:
             # Favorite button
             is_favorite = idx in st.session_state.favorites
             fav_icon = "❤️" if is_favorite else "🤍"
-            if st.button(fav_icon, key=f"fav_{idx}", use_container_width=True):
-                if is_favorite:
-                    st.session_state.favorites.remove(idx)
-                else:
-                    st.session_state.favorites.add(idx)
-                    # Track like
-                    increment_stat("total_likes", product_id=idx)
+            # The callback does the toggle (st.rerun(scope="fragment") would
+            # raise when the click is merged into a full rerun). A full rerun
+            # then refreshes the sidebar Favorites and Likes counters too.
+            if st.button(fav_icon, key=f"fav_{idx}", use_container_width=True,
+                         on_click=toggle_favorite, args=(idx,)):
                 st.rerun()
         
         with col2:
             # View details button
-            if st.button("👁️", key=f"view_{idx}", use_container_width=True, help="View details"):
-                st.session_state.selected_product = row
-                st.session_state.selected_product_id = idx
-                # Track view
-                increment_stat("total_views", product_id=idx)
-                # Track click
-                increment_stat("total_clicks", product_id=idx)
+            if st.button("👁️", key=f"view_{idx}", use_container_width=True, help="View details",
+                         on_click=select_product, args=(idx,)):
+                # app.py is the only place that opens the dialog; opening it
+                # here too duplicates it when the click lands in a full rerun
                 st.rerun()
         
         with col3:
             # Share/Link button
-            if url and is_valid_url(url):
+            if media["url_valid"]:
                 # Create a unique key for tracking link visits
                 link_key = f"link_{idx}"
                 
@@ -226,6 +414,7 @@ def render_product_card(row, idx, language="Kurdish"):
                 st.button("🔗", key=f"link_{idx}", disabled=True, use_container_width=True)
 
 # ----------------- Display Products Grid -----------------
+@timed("display.display_products")
 def display_products(df, language="Kurdish", columns_count=3, visible_count=12):
     """
     Display products in a responsive grid layout with error handling
@@ -246,16 +435,137 @@ def display_products(df, language="Kurdish", columns_count=3, visible_count=12):
         col = cols[idx % columns_count]
         
         with col:
-            render_product_card(row, row_idx, language)
+            render_product_card(row, row_idx, language, columns_count)
             st.markdown("---")  # Separator between products
 
+# ----------------- Windowed Products Grid -----------------
+PAGE_SIZE = 12
+WINDOW_PAGES = 3
+CARD_HEIGHT_ESTIMATE = 420  # px, used to size placeholders for skipped rows
+
+def get_window_size(columns_count=3):
+    """Number of cards materialized at once, rounded to whole grid rows"""
+    window = PAGE_SIZE * WINDOW_PAGES
+    return max(columns_count, (window // columns_count) * columns_count)
+
+def render_grid_placeholder(hidden_count, columns_count=3):
+    """Render a single lightweight spacer standing in for hidden cards"""
+    rows = -(-hidden_count // columns_count)
+    st.markdown(f"""
+    <div style='
+        height: {rows * CARD_HEIGHT_ESTIMATE}px;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        color: #999;
+        border: 1px dashed #ddd;
+        border-radius: 8px;
+    '>
+        {hidden_count} products
+    </div>
+    """, unsafe_allow_html=True)
+
+def get_window_bounds(total, columns_count=3, window_start=0):
+    """
+    (start, end) of the windowed grid: window_start kept inside the data and
+    aligned to grid rows
+    """
+    window_start = max(0, min(window_start, total - 1))
+    window_start -= window_start % columns_count
+    return window_start, min(total, window_start + get_window_size(columns_count))
+
+def set_window_start(window_start):
+    """Button callback moving the windowed grid"""
+    st.session_state.window_start = window_start
+
+def display_products_windowed(df, language="Kurdish", columns_count=3, window_start=0):
+    """
+    Display only a window of products around the current scroll position
+    Cards outside the window are replaced by one placeholder each side,
+    so rerun cost stays bounded however far the user has scrolled
+    """
+    if df is None or df.empty:
+        st.info("📭 No products to display")
+        return
+
+    total = len(df)
+    step = max(columns_count, (PAGE_SIZE // columns_count) * columns_count)
+    window_start, window_end = get_window_bounds(total, columns_count, window_start)
+
+    if window_start > 0:
+        # Callbacks run before the rerun the click triggers, no st.rerun() needed
+        st.button(f"⬆️ Show Previous {min(step, window_start)}", key="window_prev", use_container_width=True,
+                  on_click=set_window_start, args=(max(0, window_start - step),))
+        render_grid_placeholder(window_start, columns_count)
+
+    display_products(
+        df.iloc[window_start:window_end],
+        language=language,
+        columns_count=columns_count,
+        visible_count=window_end - window_start
+    )
+
+    if window_end < total:
+        # Button first: the spacer below can be millions of pixels tall
+        st.button(f"⬇️ Show Next {min(step, total - window_end)}", key="window_next", use_container_width=True,
+                  on_click=set_window_start, args=(window_start + step,))
+        render_grid_placeholder(total - window_end, columns_count)
+
+# ----------------- Sidebar Statistics -----------------
+# Polling is off by default: every open tab would rerun the fragment forever,
+# idle or not. ASANKAR_STATS_REFRESH_SECONDS turns it on (at least 60s).
+STATS_REFRESH_ENV = "ASANKAR_STATS_REFRESH_SECONDS"
+MIN_STATS_REFRESH_SECONDS = 60
+
+def get_stats_refresh_interval():
+    """Seconds between sidebar stats refreshes, or None for on-demand only"""
+    try:
+        seconds = float(os.environ.get(STATS_REFRESH_ENV) or 0)
+    except ValueError:
+        return None
+    return max(seconds, MIN_STATS_REFRESH_SECONDS) if seconds > 0 else None
+
+@st.fragment(run_every=get_stats_refresh_interval())
+def render_sidebar_stats(total_products, filtered_products, show_filtered=False):
+    """
+    Display product counts and analytics totals in the sidebar
+    Card hearts and views end in a full rerun, which redraws these counters;
+    the refresh button picks up other sessions' activity on its own
+    """
+    analytics = get_analytics_totals()
+
+    st.markdown("### 📈 Statistics")
+    st.metric("Total Products", total_products)
+    if show_filtered:
+        st.metric("Filtered Products", filtered_products)
+    st.metric("Favorites", len(st.session_state.favorites))
+
+    # Analytics metrics
+    with st.expander("📊 Analytics"):
+        st.metric("Total Likes", analytics.get("total_likes", 0))
+        st.metric("Total Views", analytics.get("total_views", 0))
+        st.metric("Total Clicks", analytics.get("total_clicks", 0))
+        st.metric("Link Visits", analytics.get("total_link_visits", 0))
+        st.metric("Searches", analytics.get("total_searches", 0))
+        st.metric("Unique Visitors", get_unique_count(VISIT_STAT))
+        # Clicking reruns only this fragment
+        st.button("🔄 Refresh", key="refresh_sidebar_stats", use_container_width=True)
+
 # ----------------- Product Detail Modal -----------------
 @st.dialog("Product Details", width="large")
-def show_product_modal(product, language="Kurdish"):
+@timed("display.show_product_modal")
+def show_product_modal(product_id, language="Kurdish"):
     """
     Display detailed product information in a modal dialog
+    The product row is resolved by ID from the shared cached catalog
     Tracks views when opened
     """
+    product = get_product(product_id)
+    if product is None:
+        st.warning("⚠️ This product is no longer available")
+        st.session_state.selected_product_id = None
+        return
+    
     # Get language-specific labels
     if language == "Kurdish":
         tag_label = "بابەتی"
@@ -270,28 +580,25 @@ def show_product_modal(product, language="Kurdish"):
     tags = product.get(tag_label, "N/A")
     colors = product.get(color_label, "N/A")
     materials = product.get(material_label, "N/A")
-    url = product.get("URL", "")
+    media = get_media_info(product)
+    url = media["url"]
     
-    # Get product stats if we have the ID
-    if "selected_product_id" in st.session_state:
-        product_id = st.session_state.selected_product_id
-        product_stats = get_product_stats(product_id)
-    else:
-        product_stats = {"likes": 0, "views": 0, "clicks": 0, "link_visits": 0}
+    # Get product stats
+    product_stats = get_product_stats(product_id)
     
     # Display media
     col1, col2 = st.columns([2, 1])
     
     with col1:
         try:
-            if is_youtube(url):
-                video_id = extract_youtube_id(url)
-                if video_id:
-                    embed_url = f"https://www.youtube.com/embed/{video_id}"
-                    st.video(embed_url)
-            elif is_image(url):
-                if is_valid_url(url):
-                    st.image(url, use_container_width=True)
+            if is_media_broken(media):
+                st.image(FALLBACK_LOGO, use_container_width=True)
+                st.caption("⚠️ Media unavailable")
+            elif media["media_type"] == "youtube":
+                render_youtube_media(media["youtube_id"], f"{MODAL_VIDEO_PREFIX}{media['youtube_id']}", MODAL_COLUMNS)
+            elif media["media_type"] == "image":
+                thumbnail = get_thumbnail(url, MODAL_COLUMNS)
+                st.image(thumbnail or url, use_container_width=True)
         except Exception as e:
             st.error(f"Error loading media: {e}")
     
@@ -311,15 +618,18 @@ def show_product_modal(product, language="Kurdish"):
         with col_b:
             st.metric("Clicks", product_stats.get("clicks", 0))
             st.metric("Link Visits", product_stats.get("link_visits", 0))
+        st.caption(f"👤 ~{get_unique_count('total_views', product_id):,} unique viewers")
         
-        if url and is_valid_url(url):
+        if media["url_valid"]:
             st.markdown("---")
             if st.button("🔗 Open Link", use_container_width=True):
                 # Track link visit from modal
-                if "selected_product_id" in st.session_state:
-                    increment_stat("total_link_visits", product_id=st.session_state.selected_product_id)
+                increment_stat("total_link_visits", product_id=product_id)
                 st.markdown(f'<a href="{url}" target="_blank">Opening link...</a>', unsafe_allow_html=True)
     
+    # Products with overlapping tags, colors and materials
+    render_similar_products(product_id, language)
+    
     # Additional info if available
     st.markdown("---")
     
@@ -327,7 +637,7 @@ def show_product_modal(product, language="Kurdish"):
     st.markdown("### 📊 All Information")
     info_data = {}
     for key, value in product.items():
-        if key not in [tag_label, color_label, material_label, "URL"] and pd.notna(value):
+        if key not in [tag_label, color_label, material_label, "URL"] and not str(key).startswith("_") and pd.notna(value):
             info_data[key] = value
     
     if info_data:
@@ -338,11 +648,45 @@ def show_product_modal(product, language="Kurdish"):
     
     # Close button
     if st.button("✖️ Close", use_container_width=True):
-        st.session_state.selected_product = None
-        if "selected_product_id" in st.session_state:
-            del st.session_state.selected_product_id
+        st.session_state.selected_product_id = None
+        stop_modal_videos()
         st.rerun()
 
+# ----------------- Similar Products -----------------
+SIMILAR_PRODUCTS_COUNT = 4
+
+def render_similar_products(product_id, language="Kurdish"):
+    """
+    Row of products similar to the one in the dialog (MinHash/LSH index)
+    Clicking one switches the dialog to that product
+    """
+    similar = get_similar_products(load_catalog(), product_id, limit=SIMILAR_PRODUCTS_COUNT)
+    if not similar:
+        return
+    
+    tag_label = "بابەتی" if language == "Kurdish" else "عنصر"
+    st.markdown("---")
+    st.markdown("### 🧩 Similar Products")
+    cols = st.columns(SIMILAR_PRODUCTS_COUNT)
+    for col, (similar_id, score) in zip(cols, similar):
+        product = get_product(similar_id)
+        if product is None:
+            continue
+        media = get_media_info(product)
+        with col:
+            if media["media_type"] == "youtube":
+                thumbnail_url = get_youtube_thumbnail_url(media["youtube_id"])
+                st.image(get_thumbnail(thumbnail_url, SIMILAR_PRODUCTS_COUNT) or thumbnail_url, use_container_width=True)
+            elif media["media_type"] == "image" and not is_media_broken(media):
+                st.image(get_thumbnail(media["url"], SIMILAR_PRODUCTS_COUNT) or media["url"], use_container_width=True)
+            else:
+                st.image(FALLBACK_LOGO, use_container_width=True)
+            st.caption(f"{product.get(tag_label, '')} · {score:.0%}")
+            if st.button("👁️", key=f"similar_{product_id}_{similar_id}", use_container_width=True):
+                select_product(similar_id)
+                # Full rerun: app.py reopens the dialog for the new product
+                st.rerun()
+
 # ----------------- Favorites View -----------------
 def display_favorites(df, language="Kurdish", columns_count=3):
     """
@@ -0,0 +1,164 @@
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+# Facet columns per language: tag, color, material
+FACET_COLUMNS = {
+    "Kurdish": ("بابەتی", "ڕەنگی", "پێکهاتەی"),
+    "Arabic": ("عنصر", "الالوان", "مكون من")
+}
+
+MAX_CACHED_RESULTS = 256
+
+_lock = threading.Lock()
+
+# Process-wide indexes for one catalog version:
+#   facets[column][value] -> set of product IDs whose cell lists that value
+#   search_text[product_id] -> lowercased text of all sheet fields
+_index = {
+    "version": None,
+    "facets": {},
+    "row_values": {},
+    "search_text": {}
+}
+
+# (version, filter signature) -> set of matching product IDs (None = all)
+_results = OrderedDict()
+
+# ---------- Index maintenance ----------
+def split_values(cell):
+    """Comma-separated cell -> list of stripped, non-empty values"""
+    if cell is None or (not isinstance(cell, str) and pd.isna(cell)):
+        return []
+    return [item.strip() for item in str(cell).split(",") if item.strip()]
+
+def get_facet_column_names():
+    """Every facet column for every language"""
+    return sorted({col for cols in FACET_COLUMNS.values() for col in cols})
+
+def _add_rows(df, product_ids, search_columns):
+    """Index the given products (must not be indexed yet)"""
+    facet_columns = [col for col in get_facet_column_names() if col in df.columns]
+    rows = df.loc[list(product_ids)]
+
+    for product_id, row in rows.iterrows():
+        _index["search_text"][product_id] = " ".join(str(row[col]) for col in search_columns).lower()
+        for col in facet_columns:
+            values = split_values(row[col])
+            _index["row_values"].setdefault(col, {})[product_id] = values
+            for value in values:
+                _index["facets"].setdefault(col, {}).setdefault(value, set()).add(product_id)
+
+def _remove_rows(product_ids):
+    """Drop the given products from every index"""
+    for product_id in product_ids:
+        _index["search_text"].pop(product_id, None)
+        for col, row_values in _index["row_values"].items():
+            for value in row_values.pop(product_id, []):
+                ids = _index["facets"][col].get(value)
+                if ids is None:
+                    continue
+                ids.discard(product_id)
+                if not ids:
+                    del _index["facets"][col][value]
+
+def update_index(df, version, diff=None, search_columns=None):
+    """
+    Bring the indexes to a catalog version
+
+    With a diff from the indexed version only added/removed/changed
+    products are touched, otherwise everything is rebuilt. Cached filter
+    results for older versions are evicted either way.
+    """
+    if search_columns is None:
+        search_columns = [col for col in df.columns if not str(col).startswith("_")]
+
+    with _lock:
+        if _index["version"] == version:
+            return
+
+        if diff and _index["version"] is not None and _index["version"] == diff.get("from_version"):
+            stale = set(diff["removed"]) | set(diff["changed"])
+            fresh = [pid for pid in list(diff["added"]) + list(diff["changed"]) if pid in df.index]
+            _remove_rows(stale)
+            _add_rows(df, fresh, search_columns)
+        else:
+            _index["facets"] = {}
+            _index["row_values"] = {}
+            _index["search_text"] = {}
+            _add_rows(df, df.index, search_columns)
+
+        _index["version"] = version
+        for key in [key for key in _results if key[0] != version]:
+            del _results[key]
+
+def ensure_index(df):
+    """Build the indexes if they are not for this DataFrame's catalog version"""
+    version = df.attrs.get("catalog_version") or "unversioned"
+    if _index["version"] != version:
+        update_index(df, version)
+
+# ---------- Facets ----------
+def get_facets(df, language="Kurdish"):
+    """
+    Sorted filter options for the language's tag, color and material columns
+    Returns (tags, colors, materials)
+    """
+    ensure_index(df)
+    with _lock:
+        return tuple(
+            sorted(_index["facets"].get(col, {}).keys())
+            for col in FACET_COLUMNS.get(language, FACET_COLUMNS["Kurdish"])
+        )
+
+def _facet_ids(col, selected):
+    """IDs whose cell contains any selected value (substring match, as before)"""
+    matched = set()
+    for value, ids in _index["facets"].get(col, {}).items():
+        if any(item in value for item in selected):
+            matched |= ids
+    return matched
+
+# ---------- Filtering ----------
+def filter_products(df, search="", tags=(), colors=(), materials=(), media_types=(), language="Kurdish"):
+    """
+    Apply the sidebar filters to the catalog, keeping catalog order
+    Matching IDs are cached per catalog version and filter combination
+    """
+    ensure_index(df)
+    tag_col, color_col, material_col = FACET_COLUMNS.get(language, FACET_COLUMNS["Kurdish"])
+    signature = (
+        df.attrs.get("catalog_version") or "unversioned",
+        search.lower(),
+        tuple(sorted(tags)),
+        tuple(sorted(colors)),
+        tuple(sorted(materials)),
+        language
+    )
+
+    with _lock:
+        ids = _results.get(signature)
+        if ids is not None:
+            _results.move_to_end(signature)
+        else:
+            matched = None
+            if search:
+                query = search.lower()
+                matched = {pid for pid, text in _index["search_text"].items() if query in text}
+            for col, selected in ((tag_col, tags), (color_col, colors), (material_col, materials)):
+                if selected and col in df.columns:
+                    facet_matched = _facet_ids(col, selected)
+                    matched = facet_matched if matched is None else matched & facet_matched
+            ids = matched
+
+            _results[signature] = ids
+            if len(_results) > MAX_CACHED_RESULTS:
+                _results.popitem(last=False)
+
+    # Shallow copy so the shared catalog's attrs are never tagged
+    filtered_df = df.copy(deep=False) if ids is None else df[df.index.isin(ids)]
+    if media_types:
+        filtered_df = filtered_df[filtered_df["_media_type"].isin(media_types)]
+    # Lets callers key per-result work without hashing the index
+    filtered_df.attrs["filter_signature"] = signature + (tuple(sorted(media_types)),)
+    return filtered_df
@@ -0,0 +1,62 @@
+import base64
+import hashlib
+import math
+import zlib
+
+# 2^10 one-byte registers: 1 KB per sketch, ~3.3% standard error
+PRECISION = 10
+REGISTERS = 1 << PRECISION
+HASH_BITS = 64
+
+# ---------- Sketches ----------
+def new_sketch():
+    """Empty HyperLogLog sketch"""
+    return bytearray(REGISTERS)
+
+def _hash(value):
+    """64-bit hash of a value's string form"""
+    return int.from_bytes(hashlib.sha1(str(value).encode("utf-8")).digest()[:8], "big")
+
+def add(sketch, value):
+    """
+    Add a value to a sketch in place
+    Returns True if a register changed (the value may be new)
+    """
+    h = _hash(value)
+    index = h >> (HASH_BITS - PRECISION)
+    rest = h & ((1 << (HASH_BITS - PRECISION)) - 1)
+    rank = (HASH_BITS - PRECISION) - rest.bit_length() + 1
+    if rank > sketch[index]:
+        sketch[index] = rank
+        return True
+    return False
+
+def merge(target, other):
+    """Merge other into target in place (union of the counted sets)"""
+    for i, rank in enumerate(other):
+        if rank > target[i]:
+            target[i] = rank
+    return target
+
+def estimate(sketch):
+    """Estimated number of distinct values added to a sketch"""
+    alpha = 0.7213 / (1 + 1.079 / REGISTERS)
+    raw = alpha * REGISTERS * REGISTERS / sum(2.0 ** -rank for rank in sketch)
+    zeros = sketch.count(0)
+    if raw <= 2.5 * REGISTERS and zeros:
+        # Linear counting is more accurate for small cardinalities
+        return round(REGISTERS * math.log(REGISTERS / zeros))
+    return round(raw)
+
+# ---------- Serialization ----------
+def encode(sketch):
+    """Compact text form for JSON storage (sparse sketches compress well)"""
+    return base64.b64encode(zlib.compress(bytes(sketch), 9)).decode("ascii")
+
+def decode(text):
+    """Sketch from its encode() form, an empty sketch if unreadable"""
+    try:
+        data = zlib.decompress(base64.b64decode(text))
+    except (ValueError, zlib.error):
+        return new_sketch()
+    return bytearray(data) if len(data) == REGISTERS else new_sketch()
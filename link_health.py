@@ -0,0 +1,146 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+HEALTH_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "link_health.json")
+
+CHECK_TIMEOUT = 5  # seconds per request
+CHECK_CONCURRENCY = 16
+OK_TTL = 24 * 3600  # re-check working links daily
+BROKEN_TTL = 3600  # give broken links another chance after an hour
+
+_lock = threading.Lock()
+_health = None
+_running = False
+_queued = set()  # URLs submitted while a check was running
+
+# Probes are blocking requests calls. A timed-out probe cannot be cancelled,
+# so it keeps its worker (and its concurrency slot) until requests gives up,
+# which CHECK_TIMEOUT bounds.
+_executor = ThreadPoolExecutor(max_workers=CHECK_CONCURRENCY, thread_name_prefix="link-health")
+
+# ---------- Health store ----------
+def load_health():
+    """Load cached check results (url -> {"ok", "status", "checked_at"}) once per process"""
+    global _health
+    with _lock:
+        if _health is None:
+            try:
+                with open(HEALTH_FILE, "r", encoding="utf-8") as f:
+                    _health = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                _health = {}
+        return _health
+
+def save_health():
+    """Persist check results to disk"""
+    with _lock:
+        if _health is None:
+            return
+        os.makedirs(os.path.dirname(HEALTH_FILE), exist_ok=True)
+        tmp_path = f"{HEALTH_FILE}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_health, f)
+        os.replace(tmp_path, HEALTH_FILE)
+
+def is_expired(entry, now=None):
+    """Whether a cached result is older than its TTL"""
+    ttl = OK_TTL if entry.get("ok") else BROKEN_TTL
+    return (now or time.time()) - entry.get("checked_at", 0) > ttl
+
+def is_broken(url):
+    """True only for URLs recently checked and found broken (never fetches)"""
+    entry = load_health().get(url)
+    return bool(entry) and not entry.get("ok") and not is_expired(entry)
+
+def forget_urls(urls):
+    """Drop cached results so the URLs are checked again"""
+    store = load_health()
+    with _lock:
+        for url in urls:
+            store.pop(url, None)
+    save_health()
+
+# ---------- Checks ----------
+def probe_url(url, timeout=CHECK_TIMEOUT):
+    """
+    Check one URL with HEAD, falling back to a streamed GET for servers
+    that do not support HEAD. Returns (ok, status)
+    """
+    try:
+        response = requests.head(url, timeout=timeout, allow_redirects=True)
+        if response.status_code in (403, 405, 501) or response.status_code >= 500:
+            response = requests.get(url, timeout=timeout, allow_redirects=True, stream=True)
+            response.close()
+        return response.status_code < 400, response.status_code
+    except requests.RequestException:
+        return False, None
+
+async def check_urls(urls, concurrency=CHECK_CONCURRENCY, timeout=CHECK_TIMEOUT, probe=probe_url):
+    """
+    Check many URLs concurrently, at most `concurrency` at a time
+    (capped by the probe executor's CHECK_CONCURRENCY workers)
+    Returns {url: {"ok", "status", "checked_at"}}
+    """
+    semaphore = asyncio.Semaphore(min(concurrency, CHECK_CONCURRENCY))
+    loop = asyncio.get_running_loop()
+
+    async def check(url):
+        async with semaphore:
+            future = loop.run_in_executor(_executor, probe, url, timeout)
+            try:
+                ok, status = await asyncio.wait_for(asyncio.shield(future), timeout=timeout * 2)
+            except asyncio.TimeoutError:
+                ok, status = False, None
+                # The thread is still running: hold the slot until it is free
+                await asyncio.wait([future])
+            return url, {"ok": ok, "status": status, "checked_at": time.time()}
+
+    results = await asyncio.gather(*(check(url) for url in urls))
+    return dict(results)
+
+def run_health_check(urls, **kwargs):
+    """Check the URLs whose cached result is missing or expired, and store results"""
+    store = load_health()
+    now = time.time()
+    stale = [url for url in set(urls) if url not in store or is_expired(store[url], now)]
+    if not stale:
+        return {}
+
+    results = asyncio.run(check_urls(stale, **kwargs))
+    with _lock:
+        _health.update(results)
+    save_health()
+    return results
+
+def schedule_health_check(urls):
+    """
+    Run run_health_check in a background thread (one at a time per process)
+    URLs submitted while a check is running are queued for the next round
+    """
+    global _running
+    with _lock:
+        _queued.update(urls)
+        if _running:
+            return
+        _running = True
+
+    def run():
+        global _running
+        while True:
+            with _lock:
+                pending = list(_queued)
+                _queued.clear()
+                if not pending:
+                    _running = False
+                    return
+            try:
+                run_health_check(pending)
+            except Exception:
+                pass
+
+    threading.Thread(target=run, name="link-health", daemon=True).start()
@@ -0,0 +1,224 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Exporting is off unless one of these is set:
+#   ASANKAR_METRICS_PORT=9108        -> serve http://127.0.0.1:9108/metrics
+#   ASANKAR_METRICS_FILE=metrics.prom -> rewrite the file every few seconds
+# ASANKAR_METRICS_HOST=0.0.0.0 exposes the endpoint beyond this machine.
+METRICS_PORT_ENV = "ASANKAR_METRICS_PORT"
+METRICS_HOST_ENV = "ASANKAR_METRICS_HOST"
+METRICS_FILE_ENV = "ASANKAR_METRICS_FILE"
+DEFAULT_METRICS_HOST = "127.0.0.1"
+METRICS_WRITE_INTERVAL = 15  # seconds between file writes
+ACTIVE_SESSION_WINDOW = 300  # a session is active if it reran this recently
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    "asankar_catalog_cache_requests_total": ("counter", "Catalog lookups by cache result (hit/miss)", None),
+    "asankar_sheet_fetch_seconds": ("histogram", "Time to fetch and clean the product sheet", (0.1, 0.25, 0.5, 1, 2, 5, 10, 30)),
+    "asankar_sheet_fetch_failures_total": ("counter", "Failed product sheet fetches by reason", None),
+    "asankar_increment_stat_seconds": ("histogram", "Time to record one analytics increment", DEFAULT_BUCKETS),
+    "asankar_stat_increments_total": ("counter", "Analytics increments by stat", None),
+    "asankar_app_data_write_seconds": ("histogram", "Time to write app_data.json", DEFAULT_BUCKETS),
+    "asankar_app_data_write_failures_total": ("counter", "Failed app_data.json writes", None),
+    "asankar_reruns_total": ("counter", "Full script reruns of app.py", None),
+    "asankar_rerun_seconds": ("histogram", "Duration of a full app.py rerun", DEFAULT_BUCKETS),
+    "asankar_active_sessions": ("gauge", f"Sessions that reran in the last {ACTIVE_SESSION_WINDOW}s", None),
+    "asankar_session_state_bytes": ("gauge", "Estimated session state size by session status (active/idle)", None),
+    "asankar_tracked_sessions": ("gauge", "Sessions with memory accounting by status (active/idle)", None),
+    "asankar_session_evictions_total": ("counter", "Idle sessions whose large state objects were dropped", None),
+    "asankar_api_requests_total": ("counter", "JSON API requests by endpoint and status", None)
+}
+
+_lock = threading.Lock()
+_counters = {}  # (name, labels) -> value
+_gauges = {}  # (name, labels) -> value
+_histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+_sessions = {}  # session id -> last rerun time
+_local = threading.local()
+_exporter_started = False
+
+# ---------- Recording ----------
+def _key(name, labels):
+    """Registry key: metric name plus sorted label pairs"""
+    return name, tuple(sorted((labels or {}).items()))
+
+def inc_counter(name, value=1, labels=None):
+    """Add to a counter"""
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def set_gauge(name, value, labels=None):
+    """Set a gauge to a value"""
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+def observe(name, value, labels=None):
+    """Record one histogram observation (seconds for *_seconds metrics)"""
+    buckets = METRICS[name][2]
+    key = _key(name, labels)
+    with _lock:
+        state = _histograms.get(key)
+        if state is None:
+            state = _histograms[key] = [0] * len(buckets) + [0.0, 0]
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                state[i] += 1
+        state[-2] += value
+        state[-1] += 1
+
+@contextmanager
+def timer(name, labels=None):
+    """Observe the duration of a block in a histogram"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, labels)
+
+# ---------- Cache hits ----------
+@contextmanager
+def cache_lookup(name="catalog"):
+    """
+    Count a call to an st.cache_data function as a hit or a miss
+    The cached function calls mark_cache_miss() from its body, which only
+    runs (in the caller's thread) on a miss
+    """
+    _local.missed = False
+    try:
+        yield
+    finally:
+        result = "miss" if getattr(_local, "missed", False) else "hit"
+        inc_counter(f"asankar_{name}_cache_requests_total", labels={"result": result})
+
+def mark_cache_miss():
+    """Called from inside a cached function body"""
+    _local.missed = True
+
+# ---------- Sessions ----------
+def record_rerun(session_id, seconds):
+    """Count a full rerun and mark its session active"""
+    now = time.time()
+    inc_counter("asankar_reruns_total")
+    observe("asankar_rerun_seconds", seconds)
+    with _lock:
+        _sessions[session_id] = now
+        for sid in [sid for sid, seen in _sessions.items() if now - seen > ACTIVE_SESSION_WINDOW]:
+            del _sessions[sid]
+        _gauges[_key("asankar_active_sessions", None)] = len(_sessions)
+
+def get_session_id():
+    """ID of the Streamlit session running the current script, or None"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else None
+    except Exception:
+        return None
+
+# ---------- Prometheus text format ----------
+def _escape_label_value(value):
+    """Escape backslashes, quotes and newlines in a label value"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels, extra=()):
+    """{a="1",b="2"} or an empty string"""
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs) + "}"
+
+def _format_value(value):
+    """Prometheus number formatting"""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format"""
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        histograms = {key: list(state) for key, state in _histograms.items()}
+
+    lines = []
+    for name, (metric_type, help_text, buckets) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        if metric_type == "histogram":
+            for (metric, labels), state in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                for bound, count in zip(buckets, state):
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', _format_value(float(bound)))])} {count}")
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {state[-1]}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(state[-2])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {state[-1]}")
+        else:
+            values = counters if metric_type == "counter" else gauges
+            for (metric, labels), value in sorted(values.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+# ---------- Exporters ----------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves render_metrics() at /metrics"""
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def write_metrics_file(path):
+    """Atomically replace the metrics file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render_metrics())
+    os.replace(tmp_path, path)
+
+def start_exporter():
+    """
+    Start the HTTP endpoint and/or file writer configured in the environment
+    Safe to call on every rerun: only the first call starts anything
+    """
+    global _exporter_started
+    with _lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+
+    port = os.environ.get(METRICS_PORT_ENV)
+    if port:
+        host = os.environ.get(METRICS_HOST_ENV) or DEFAULT_METRICS_HOST
+        try:
+            server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        except (OSError, ValueError):
+            pass
+
+    path = os.environ.get(METRICS_FILE_ENV)
+    if path:
+        def write_loop():
+            while True:
+                try:
+                    write_metrics_file(path)
+                except OSError:
+                    pass
+                time.sleep(METRICS_WRITE_INTERVAL)
+
+        threading.Thread(target=write_loop, name="metrics-file", daemon=True).start()
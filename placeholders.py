@@ -0,0 +1,148 @@
+import base64
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageFilter, ImageOps
+from thumbnails import fetch_original, get_url_key
+
+PLACEHOLDER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "placeholders.json")
+
+PLACEHOLDER_SIZE = 16  # px on the long side
+PLACEHOLDER_QUALITY = 50
+PRECOMPUTE_WORKERS = 8
+FAILURE_TTL = 6 * 3600  # seconds before an image that failed is tried again
+
+_lock = threading.Lock()
+_placeholders = None
+_running = set()
+
+# ---------- Placeholder store ----------
+def load_placeholders():
+    """
+    Load the persisted placeholders once per process
+    url key -> {"lqip", "aspect_ratio"}, or {"failed_at"} for images that
+    could not be processed
+    """
+    global _placeholders
+    with _lock:
+        if _placeholders is None:
+            try:
+                with open(PLACEHOLDER_FILE, "r", encoding="utf-8") as f:
+                    _placeholders = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                _placeholders = {}
+        return _placeholders
+
+def save_placeholders():
+    """Persist the placeholder store to disk"""
+    with _lock:
+        if _placeholders is None:
+            return
+        os.makedirs(os.path.dirname(PLACEHOLDER_FILE), exist_ok=True)
+        tmp_path = f"{PLACEHOLDER_FILE}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_placeholders, f)
+        os.replace(tmp_path, PLACEHOLDER_FILE)
+
+def get_placeholder(url):
+    """Return {"lqip", "aspect_ratio"} for an image URL if already computed"""
+    if not url or not isinstance(url, str):
+        return None
+    entry = load_placeholders().get(get_url_key(url))
+    return entry if entry and "lqip" in entry else None
+
+def get_row_placeholder(row, url):
+    """
+    Placeholder for a catalog row at render time: the catalog snapshot's
+    columns, or the store if it was computed after the catalog was loaded
+    """
+    lqip = row.get("_lqip")
+    aspect_ratio = row.get("_aspect_ratio")
+    if isinstance(lqip, str) and isinstance(aspect_ratio, (int, float)) and aspect_ratio == aspect_ratio:
+        return {"lqip": lqip, "aspect_ratio": aspect_ratio}
+    return get_placeholder(url)
+
+def needs_precompute(url, now=None):
+    """Whether an image has no placeholder and did not fail within FAILURE_TTL"""
+    if not url or not isinstance(url, str):
+        return False
+    entry = load_placeholders().get(get_url_key(url))
+    if entry is None:
+        return True
+    return "failed_at" in entry and (now or time.time()) - entry["failed_at"] > FAILURE_TTL
+
+def forget_placeholders(urls):
+    """Drop stored placeholders for URLs that left the catalog"""
+    store = load_placeholders()
+    with _lock:
+        for url in urls:
+            store.pop(get_url_key(url), None)
+    save_placeholders()
+
+# ---------- Precompute ----------
+def compute_placeholder(url):
+    """
+    Derive a tiny blurred preview and the intrinsic aspect ratio of an image
+    The preview is a base64 JPEG data URI of a few hundred bytes
+    """
+    with Image.open(io.BytesIO(fetch_original(url))) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        aspect_ratio = round(image.width / image.height, 4)
+        image.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+        image = image.filter(ImageFilter.GaussianBlur(1))
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=PLACEHOLDER_QUALITY)
+
+    encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return {
+        "lqip": f"data:image/jpeg;base64,{encoded}",
+        "aspect_ratio": aspect_ratio
+    }
+
+def precompute_placeholders(urls):
+    """
+    Compute placeholders for every URL that does not have one yet
+    Returns the number of new placeholders
+    """
+    now = time.time()
+    missing = {get_url_key(url): url for url in urls if needs_precompute(url, now)}
+    if not missing:
+        return 0
+
+    def compute(item):
+        key, url = item
+        try:
+            return key, compute_placeholder(url)
+        except Exception:
+            return key, None
+
+    with ThreadPoolExecutor(max_workers=PRECOMPUTE_WORKERS) as executor:
+        results = list(executor.map(compute, missing.items()))
+
+    # Failures are stored too, so catalog loads do not retry them until FAILURE_TTL
+    failed_at = time.time()
+    with _lock:
+        _placeholders.update((key, value or {"failed_at": failed_at}) for key, value in results)
+    save_placeholders()
+    return sum(1 for _, value in results if value)
+
+def schedule_precompute(urls):
+    """Run precompute_placeholders in a background thread, once per URL set"""
+    urls = tuple(sorted(set(urls)))
+    job_key = hash(urls)
+    with _lock:
+        if job_key in _running:
+            return
+        _running.add(job_key)
+
+    def run():
+        try:
+            precompute_placeholders(urls)
+        finally:
+            with _lock:
+                _running.discard(job_key)
+
+    threading.Thread(target=run, name="placeholders", daemon=True).start()
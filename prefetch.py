@@ -0,0 +1,58 @@
+import threading
+import streamlit as st
+from catalog import get_catalog_version
+from display import get_media_info, get_media_check_url, is_media_broken
+from thumbnails import submit_thumbnail
+
+# ---------- Background jobs ----------
+def cancel_prefetch():
+    """Cancel the current session's pending prefetch job, if any"""
+    job = st.session_state.get("prefetch_job")
+    if not job:
+        return
+    job["cancel"].set()
+    for future in job["futures"]:
+        future.cancel()
+    st.session_state.prefetch_job = None
+
+def prefetch_media(urls, columns_count=3, token=None):
+    """
+    Download and thumbnail media in the background
+    A job with a new token replaces (and cancels) the session's previous one
+    """
+    job = st.session_state.get("prefetch_job")
+    if job and job["token"] == token:
+        return
+    cancel_prefetch()
+
+    cancel_event = threading.Event()
+    # Builds run on the thumbnail executor shared with the card renders
+    futures = [submit_thumbnail(url, columns_count, cancel_event) for url in urls]
+    futures = [future for future in futures if future is not None]
+    st.session_state.prefetch_job = {
+        "token": token,
+        "cancel": cancel_event,
+        "futures": futures
+    }
+
+def prefetch_next_page(df, start, columns_count=3, page_size=12):
+    """
+    Prefetch media for the page of df that follows the visible one
+    A new catalog version, filter or page cancels the previous job
+    """
+    next_df = df.iloc[start:start + page_size]
+    if "URL" not in next_df.columns or next_df.empty:
+        cancel_prefetch()
+        return
+
+    urls = []
+    for _, row in next_df.iterrows():
+        media = get_media_info(row)
+        check_url = get_media_check_url(media)
+        if check_url and not is_media_broken(media):
+            urls.append(check_url)
+
+    # filter_products tags its result; the length covers untagged frames
+    result_key = df.attrs.get("filter_signature", len(df))
+    token = (get_catalog_version(df), result_key, start, columns_count)
+    prefetch_media(urls, columns_count, token=token)
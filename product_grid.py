@@ -0,0 +1,187 @@
+import hashlib
+import math
+import os
+import streamlit as st
+import streamlit.components.v1 as components
+from display import get_media_info, get_youtube_thumbnail_url, is_media_broken, select_product
+from placeholders import get_row_placeholder
+from settings import get_product_stats, increment_stat
+from thumbnails import get_thumbnail_urls
+from prefetch import prefetch_next_page
+
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend", "product_grid")
+
+_product_grid = components.declare_component("product_grid", path=FRONTEND_DIR)
+
+# ----------------- Card Payload -----------------
+def get_field_labels(language="Kurdish"):
+    """Return the (tag, color, material) column labels for a language"""
+    if language == "Kurdish":
+        return "بابەتی", "ڕەنگی", "پێکهاتەی"
+    return "عنصر", "الالوان", "مكون من"
+
+def build_card_item(row, idx, language="Kurdish", columns_count=3):
+    """
+    Build the JSON payload for one product card
+    Only plain values are sent, the browser templates them into HTML
+    """
+    media = get_media_info(row)
+    url = media["url"]
+    labels = get_field_labels(language)
+
+    # The browser only distinguishes playable/showable media from the rest
+    media_type = media["media_type"]
+    if is_media_broken(media):
+        media_type = "broken"
+    elif media_type == "youtube_invalid":
+        media_type = "invalid"
+    elif media_type not in ("youtube", "image"):
+        media_type = "other"
+
+    # Videos start as a thumbnail facade, images as a grid-sized thumbnail
+    youtube_id = media["youtube_id"]
+    if media_type == "youtube":
+        thumbnail = get_thumbnail_urls(get_youtube_thumbnail_url(youtube_id), columns_count)
+        thumbnail = thumbnail or {"webp": get_youtube_thumbnail_url(youtube_id), "jpg": get_youtube_thumbnail_url(youtube_id)}
+    elif media_type == "image":
+        thumbnail = get_thumbnail_urls(url, columns_count)
+    else:
+        thumbnail = None
+
+    product_stats = get_product_stats(idx)
+    stats_parts = []
+    if product_stats.get("likes", 0) > 0:
+        stats_parts.append(f"❤️ {product_stats['likes']}")
+    if product_stats.get("views", 0) > 0:
+        stats_parts.append(f"👁️ {product_stats['views']}")
+    if product_stats.get("link_visits", 0) > 0:
+        stats_parts.append(f"🔗 {product_stats['link_visits']}")
+
+    return {
+        "id": str(idx),
+        "url": url,
+        "media_type": media_type,
+        "thumbnail": thumbnail,
+        "placeholder": get_row_placeholder(row, url) if media_type == "image" else None,
+        "youtube_id": youtube_id,
+        "fields": [
+            {"label": label, "value": str(row.get(label, "N/A"))}
+            for label in labels
+        ],
+        "stats": " • ".join(stats_parts),
+        "link": url if media["url_valid"] else None,
+        "is_favorite": idx in st.session_state.favorites
+    }
+
+def get_feed_token(df, language="Kurdish", columns_count=3):
+    """Fingerprint of the filtered result, used to reset the feed on change"""
+    digest = hashlib.md5()
+    digest.update(f"{language}|{columns_count}|{len(df)}|".encode("utf-8"))
+    digest.update(",".join(map(str, df.index)).encode("utf-8"))
+    return digest.hexdigest()
+
+# ----------------- Click Callbacks -----------------
+def handle_card_event(df, event, key, language="Kurdish"):
+    """
+    Apply a like/view/link click reported by the grid component
+    Component values persist across reruns, so each event is applied once
+    """
+    if not isinstance(event, dict) or event.get("event") not in ("like", "view", "link"):
+        return
+
+    nonce_key = f"{key}_last_nonce"
+    if st.session_state.get(nonce_key) == event.get("nonce"):
+        return
+    st.session_state[nonce_key] = event.get("nonce")
+
+    # Card ids are the string product IDs the catalog is indexed by
+    idx = event.get("id")
+    if not isinstance(idx, str) or idx not in df.index:
+        return
+
+    action = event["event"]
+    if action == "like":
+        if idx in st.session_state.favorites:
+            st.session_state.favorites.remove(idx)
+        else:
+            st.session_state.favorites.add(idx)
+            increment_stat("total_likes", product_id=idx)
+    elif action == "view":
+        select_product(idx)
+        # app.py opens the dialog for selected_product_id later in this run
+    elif action == "link":
+        increment_stat("total_link_visits", product_id=idx)
+
+# ----------------- Single-Payload Grid -----------------
+def html_product_grid(df, language="Kurdish", columns_count=3, visible_count=12, key="product_grid"):
+    """
+    Display the visible products as one HTML payload
+    The whole grid is a single component element instead of several
+    Streamlit elements and widgets per card
+    """
+    if df is None or df.empty:
+        st.info("📭 No products to display")
+        return
+
+    handle_card_event(df, st.session_state.get(key), key, language)
+
+    df_display = df.head(visible_count)
+    items = [
+        build_card_item(row, row_idx, language, columns_count)
+        for row_idx, row in df_display.iterrows()
+    ]
+
+    _product_grid(
+        mode="grid",
+        token=get_feed_token(df_display, language, columns_count),
+        columns=columns_count,
+        items=items,
+        key=key,
+        default=None
+    )
+
+# ----------------- Infinite Scroll Feed -----------------
+def infinite_product_feed(df, language="Kurdish", columns_count=3, page_size=12, key="product_feed"):
+    """
+    Display products as an infinite-scroll feed
+
+    The browser keeps every page it has already appended, and asks for the
+    next one when a sentinel below the grid scrolls into view. Each rerun
+    sends only the requested page, so the payload is proportional to
+    page_size no matter how many products are on screen. Card clicks
+    come back as events on the same component value.
+    """
+    if df is None or df.empty:
+        st.info("📭 No products to display")
+        return
+
+    handle_card_event(df, st.session_state.get(key), key, language)
+
+    token = get_feed_token(df, language, columns_count)
+    total_pages = math.ceil(len(df) / page_size)
+
+    # The last event from the browser says which page it is waiting for
+    page = 0
+    event = st.session_state.get(key)
+    if isinstance(event, dict) and event.get("token") == token:
+        page = max(0, min(int(event.get("page", 0)), total_pages - 1))
+
+    page_df = df.iloc[page * page_size:(page + 1) * page_size]
+    items = [
+        build_card_item(row, row_idx, language, columns_count)
+        for row_idx, row in page_df.iterrows()
+    ]
+
+    # The browser will ask for the following page next, warm its media now
+    prefetch_next_page(df, (page + 1) * page_size, columns_count, page_size)
+
+    _product_grid(
+        mode="feed",
+        token=token,
+        page=page,
+        total_pages=total_pages,
+        columns=columns_count,
+        items=items,
+        key=key,
+        default=None
+    )
@@ -0,0 +1,166 @@
+import functools
+import hmac
+import os
+import threading
+import time
+from collections import deque
+import streamlit as st
+from metrics import get_session_id
+
+# Profiling is off unless ASANKAR_PROFILE=1 (whole process) or a session opens
+# ?profile=<key> with the key set in ASANKAR_PROFILE_KEY (that session only)
+PROFILE_ENV = "ASANKAR_PROFILE"
+PROFILE_KEY_ENV = "ASANKAR_PROFILE_KEY"
+PROFILE_QUERY_PARAM = "profile"
+MAX_SAMPLES = 1024  # most recent durations kept per span
+MAX_PROFILED_SESSIONS = 32
+
+_enabled = os.environ.get(PROFILE_ENV) == "1"
+_lock = threading.Lock()
+_samples = {}
+# Session IDs profiling through ?profile=<key>, oldest first
+_profiled_sessions = {}
+
+# ---------- Spans ----------
+class _NullSpan:
+    """Shared no-op span used while profiling is disabled"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    """Times a block and records the duration under its name"""
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+def _is_active():
+    """Whether the current call should be recorded"""
+    return _enabled or bool(_profiled_sessions) and get_session_id() in _profiled_sessions
+
+def span(name):
+    """Context manager timing a named phase (no-op when disabled)"""
+    return _Span(name) if _is_active() else _NULL_SPAN
+
+def timed(name):
+    """Decorator version of span(); checks the flag on every call"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _is_active():
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def record(name, seconds):
+    """Add one duration sample to a span"""
+    with _lock:
+        samples = _samples.get(name)
+        if samples is None:
+            samples = _samples[name] = deque(maxlen=MAX_SAMPLES)
+        samples.append(seconds)
+
+# ---------- Control ----------
+def is_enabled():
+    """Whether spans are currently being recorded for this session"""
+    return _is_active()
+
+def set_enabled(enabled=True):
+    """Turn recording on or off for the whole process"""
+    global _enabled
+    _enabled = bool(enabled)
+
+def reset():
+    """Forget every recorded sample"""
+    with _lock:
+        _samples.clear()
+
+# ---------- Aggregation ----------
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+def get_span_stats():
+    """
+    Aggregate recorded spans
+    Returns {name: {"count", "p50", "p95", "p99", "max"}} with times in ms
+    """
+    with _lock:
+        snapshot = {name: sorted(samples) for name, samples in _samples.items()}
+
+    return {
+        name: {
+            "count": len(values),
+            "p50": percentile(values, 50) * 1000,
+            "p95": percentile(values, 95) * 1000,
+            "p99": percentile(values, 99) * 1000,
+            "max": values[-1] * 1000
+        }
+        for name, values in sorted(snapshot.items())
+        if values
+    }
+
+# ---------- Debug panel ----------
+def enable_from_query_params():
+    """
+    Profile the current session while the page is opened with ?profile=<key>
+    Does nothing unless ASANKAR_PROFILE_KEY is set. Returns whether this
+    session gets the debug panel.
+    """
+    key = os.environ.get(PROFILE_KEY_ENV)
+    requested = st.query_params.get(PROFILE_QUERY_PARAM)
+    allowed = bool(key and requested) and hmac.compare_digest(str(requested), key)
+    session_id = get_session_id()
+    if session_id is None:
+        return allowed
+    with _lock:
+        if allowed:
+            _profiled_sessions[session_id] = True
+            while len(_profiled_sessions) > MAX_PROFILED_SESSIONS:
+                _profiled_sessions.pop(next(iter(_profiled_sessions)))
+        else:
+            _profiled_sessions.pop(session_id, None)
+    return allowed
+
+def render_debug_panel():
+    """Show per-span latency percentiles in a sidebar expander"""
+    stats = get_span_stats()
+    with st.sidebar.expander("⏱️ Performance (debug)"):
+        if not stats:
+            st.caption("No samples yet")
+            return
+        st.dataframe(
+            [
+                {
+                    "span": name,
+                    "count": row["count"],
+                    "p50 ms": round(row["p50"], 2),
+                    "p95 ms": round(row["p95"], 2),
+                    "p99 ms": round(row["p99"], 2),
+                    "max ms": round(row["max"], 2)
+                }
+                for name, row in stats.items()
+            ],
+            hide_index=True,
+            use_container_width=True
+        )
+        if st.button("Reset samples", key="profiler_reset", use_container_width=True):
+            reset()
@@ -1,5 +1,7 @@
 import streamlit as st
 import os
+from styles import register_style
+from assets import build_watermark, parse_px
 
 def add_rotated_background_logo(
     logo_path="background_logo.png", 
@@ -8,7 +10,10 @@ def add_rotated_background_logo(
     size="300px"
 ):
     """
-    Adds a rotated logo as background watermark using CSS.
+    Adds a rotated logo as background watermark.
+    The rotated, faded image is pre-rendered once with Pillow and served
+    from static/ under a content-hashed name, so the browser does no
+    transform or opacity work and can cache it indefinitely.
     Works on Streamlit Cloud and mobile devices.
     
     Args:
@@ -33,19 +38,31 @@ def add_rotated_background_logo(
         return
     
     try:
-        # Create a container for the background logo
-        st.markdown(f"""
+        # Render at 2x the CSS size for high-density screens
+        logo_url, canvas_ratio = build_watermark(
+            logo_path,
+            rotation=rotation,
+            opacity=opacity,
+            width=int(parse_px(size) * 2),
+            mtime=os.path.getmtime(logo_path)
+        )
+        
+        # The rotated canvas is wider than the logo, keep the logo at `size`
+        width = f"calc({size} * {canvas_ratio:.4f})"
+        mobile_width = f"calc(200px * {canvas_ratio:.4f})"
+        
+        # Watermark CSS goes into the shared app stylesheet
+        register_style("rotlogo.background", f"""
         <style>
             /* Background logo watermark */
             .background-logo {{
                 position: fixed !important;
                 top: 50%;
                 left: 50%;
-                transform: translate(-50%, -50%) rotate({rotation}deg);
-                opacity: {opacity};
+                transform: translate(-50%, -50%);
                 z-index: -1;
                 pointer-events: none;
-                width: {size};
+                width: {width};
                 height: auto;
             }}
             
@@ -58,7 +75,7 @@ def add_rotated_background_logo(
             /* Mobile optimizations */
             @media (max-width: 768px) {{
                 .background-logo {{
-                    width: 200px;
+                    width: {mobile_width};
                 }}
             }}
             
@@ -69,15 +86,11 @@ def add_rotated_background_logo(
                 }}
             }}
         </style>
-        """, unsafe_allow_html=True)
-        
-        # Add the logo image
-        # Using data URL to embed the image would be more reliable but more complex
-        # For now, we'll use st.image with custom CSS
+        """)
         
         # Create image element with custom class
         st.markdown(f"""
-        <img src="app/static/{logo_path}" class="background-logo" alt="Background Logo">
+        <img src="{logo_url}" class="background-logo" alt="Background Logo">
         """, unsafe_allow_html=True)
         
     except Exception as e:
@@ -88,7 +101,7 @@ def add_custom_css():
     """
     Add general custom CSS improvements for the app
     """
-    st.markdown("""
+    register_style("rotlogo.custom_css", """
     <style>
         /* Smooth transitions */
         * {
@@ -143,4 +156,4 @@ def add_custom_css():
             background-color: #e3f2fd;
         }
     </style>
-    """, unsafe_allow_html=True)
+    """)
@@ -0,0 +1,164 @@
+import sys
+import threading
+import time
+import weakref
+import pandas as pd
+import streamlit as st
+from metrics import inc_counter, set_gauge, get_session_id
+
+IDLE_TIMEOUT = 600  # seconds without a rerun before a session counts as idle
+ACCOUNTING_INTERVAL = 30  # re-measure a session's state at most this often
+SWEEP_INTERVAL = 60  # look for idle sessions at most this often
+
+# Per-session objects that are safe to drop. Idle sessions lose them; the
+# owner recreates them on the session's next rerun if it still needs them:
+#   prefetch_job: pending thumbnail futures (prefetch_next_page starts a new job)
+#   playing_videos: started players, which fall back to their thumbnail facade
+# Nothing else in session state is large: the catalog, filter results and
+# analytics are process-wide caches, pages are rebuilt from them every run,
+# and the remaining keys are scalars, small sets and widget values.
+EVICTABLE_KEYS = ["prefetch_job", "playing_videos"]
+
+_lock = threading.Lock()
+# session id -> {"state": weakref to the session's state, "last_seen", "bytes", "measured_at"}
+_sessions = {}
+_last_sweep = 0.0
+
+# ---------- Size estimates ----------
+def estimate_size(value, _seen=None):
+    """Approximate deep size in bytes of a session state value"""
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    size = sys.getsizeof(value, 0)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, _seen) + estimate_size(v, _seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _seen) for item in value)
+    return size
+
+def measure_session_state():
+    """Estimated bytes held by the current session's state"""
+    return sum(
+        estimate_size(key) + estimate_size(st.session_state[key])
+        for key in list(st.session_state.keys())
+    )
+
+# ---------- Tracking and eviction ----------
+def _release(key, value):
+    """Stop background work owned by an evicted value"""
+    if key == "prefetch_job" and value:
+        value["cancel"].set()
+        for future in value["futures"]:
+            future.cancel()
+
+def _get_state_ref():
+    """
+    Weak reference to the current session's state object, or None
+    ctx.session_state is a SafeSessionState wrapper that every ScriptRunner
+    creates anew, so the reference is to the SessionState it wraps, which
+    lives as long as the session
+    """
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        if ctx is None:
+            return None
+        state = getattr(ctx.session_state, "_state", ctx.session_state)
+        return weakref.ref(state)
+    except Exception:
+        return None
+
+def evict_idle_sessions(now=None):
+    """
+    Drop EVICTABLE_KEYS from sessions idle for longer than IDLE_TIMEOUT
+    Sessions whose state was garbage collected are forgotten
+    Returns the number of sessions that had something evicted
+    """
+    now = now or time.time()
+    with _lock:
+        entries = list(_sessions.items())
+
+    evicted = 0
+    for session_id, entry in entries:
+        state = entry["state"]() if entry["state"] else None
+        if state is None:
+            with _lock:
+                _sessions.pop(session_id, None)
+            continue
+        if now - entry["last_seen"] < IDLE_TIMEOUT or entry.get("evicted"):
+            continue
+
+        freed = 0
+        for key in EVICTABLE_KEYS:
+            try:
+                if key in state:
+                    value = state[key]
+                    freed += estimate_size(value)
+                    _release(key, value)
+                    del state[key]
+            except Exception:
+                pass
+        with _lock:
+            entry["evicted"] = True
+            if entry["bytes"] is not None:
+                entry["bytes"] = max(0, entry["bytes"] - freed)
+        if freed:
+            evicted += 1
+
+    if evicted:
+        inc_counter("asankar_session_evictions_total", evicted)
+    return evicted
+
+def update_memory_metrics(now=None):
+    """Publish estimated session state bytes, split into active and idle sessions"""
+    now = now or time.time()
+    totals = {"active": 0, "idle": 0}
+    counts = {"active": 0, "idle": 0}
+    with _lock:
+        for entry in _sessions.values():
+            status = "active" if now - entry["last_seen"] < IDLE_TIMEOUT else "idle"
+            totals[status] += entry["bytes"] or 0
+            counts[status] += 1
+
+    for status in totals:
+        set_gauge("asankar_session_state_bytes", totals[status], {"status": status})
+        set_gauge("asankar_tracked_sessions", counts[status], {"status": status})
+
+def track_session():
+    """
+    Call once per rerun: marks the session active, re-measures its state now
+    and then, and evicts idle sessions' large objects now and then
+    """
+    global _last_sweep
+    session_id = get_session_id()
+    if session_id is None:
+        return
+    now = time.time()
+
+    with _lock:
+        entry = _sessions.get(session_id)
+        if entry is None or entry["state"] is None or entry["state"]() is None:
+            entry = _sessions[session_id] = {"state": _get_state_ref(), "bytes": None, "measured_at": 0}
+        entry["last_seen"] = now
+        entry["evicted"] = False
+        measure = now - entry["measured_at"] >= ACCOUNTING_INTERVAL
+        sweep = now - _last_sweep >= SWEEP_INTERVAL
+        if sweep:
+            _last_sweep = now
+
+    if measure:
+        size = measure_session_state()
+        with _lock:
+            entry["bytes"] = size
+            entry["measured_at"] = now
+    if sweep:
+        evict_idle_sessions(now)
+    if measure or sweep:
+        update_memory_metrics(now)
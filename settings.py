@@ -6,10 +6,22 @@ from google.oauth2.service_account import Credentials
 from datetime import datetime
 import time
 import os
+import threading
+from assets import get_sidebar_logo_url
+from profiler import timed
+from metrics import inc_counter, observe, timer, get_session_id
+from visitors import is_repeat, record_visitor
 
 APP_DATA_FILE = "app_data.json"
 
+# Counters shown in the sidebar and footer
+TOTAL_STATS = ["total_likes", "total_views", "total_clicks", "total_link_visits", "total_searches"]
+
+# Path of a local .csv/.json catalog to use instead of the Google Sheet
+CATALOG_FIXTURE_ENV = "ASANKAR_CATALOG_FIXTURE"
+
 # ---------- App data with error handling ----------
+@timed("settings.load_app_data")
 def load_app_data():
     """Load persisted app settings from JSON with error handling"""
     try:
@@ -44,14 +56,20 @@ def get_default_app_data():
         }
     }
 
+@timed("settings.save_app_data")
 def save_app_data(data):
     """Save app settings to JSON with error handling"""
     try:
         data["last_updated"] = datetime.now().isoformat()
-        with open(APP_DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # Readers never lock, so they must only ever see a complete file
+        tmp_path = f"{APP_DATA_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with timer("asankar_app_data_write_seconds"):
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, APP_DATA_FILE)
         return True
     except Exception as e:
+        inc_counter("asankar_app_data_write_failures_total")
         st.error(f"❌ Error saving settings: {e}")
         return False
 
@@ -60,23 +78,87 @@ def load_analytics():
     """Load analytics data from app_data.json"""
     app_data = load_app_data()
     if "analytics" not in app_data:
-        app_data["analytics"] = {
-            "total_likes": 0,
-            "total_views": 0,
-            "total_clicks": 0,
-            "total_link_visits": 0,
-            "total_searches": 0,
-            "product_stats": {}
-        }
-        save_app_data(app_data)
+        def add_analytics(data):
+            data.setdefault("analytics", get_default_app_data()["analytics"])
+        app_data = update_app_data(add_analytics)
     return app_data["analytics"]
 
 def save_analytics(analytics_data):
     """Save analytics data to app_data.json"""
-    app_data = load_app_data()
-    app_data["analytics"] = analytics_data
-    save_app_data(app_data)
+    def replace_analytics(data):
+        data["analytics"] = analytics_data
+    update_app_data(replace_analytics)
+
+# ---------- Shared analytics view ----------
+# One in-memory copy of the analytics per process, shared by all sessions.
+# It is refreshed when app_data.json changes on disk and replaced directly
+# after this process writes it.
+_analytics_lock = threading.Lock()
+_analytics_view = {"signature": None, "analytics": None}
+
+def _app_data_signature():
+    """(mtime, size) of app_data.json, or None if it does not exist"""
+    try:
+        stat = os.stat(APP_DATA_FILE)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+def _publish_analytics(analytics):
+    """Make freshly saved analytics the shared view"""
+    with _analytics_lock:
+        _analytics_view["analytics"] = analytics
+        _analytics_view["signature"] = _app_data_signature()
+
+def get_analytics_view():
+    """
+    Process-wide analytics dict (read-only for callers)
+    Only re-reads app_data.json when another process has changed it
+    """
+    signature = _app_data_signature()
+    with _analytics_lock:
+        if _analytics_view["analytics"] is not None and _analytics_view["signature"] == signature:
+            return _analytics_view["analytics"]
+    analytics = load_analytics()
+    with _analytics_lock:
+        _analytics_view["analytics"] = analytics
+        _analytics_view["signature"] = signature
+    return analytics
+
+def get_analytics_totals():
+    """The global counters only, e.g. {"total_likes": 3, ...}"""
+    analytics = get_analytics_view()
+    return {name: analytics.get(name, 0) for name in TOTAL_STATS}
+
+# Map total stat name to product stat
+PRODUCT_STAT_MAPPING = {
+    "total_likes": "likes",
+    "total_views": "views",
+    "total_clicks": "clicks",
+    "total_link_visits": "link_visits"
+}
+
+# Serializes every read-modify-write cycle of app_data.json within this process
+_analytics_write_lock = threading.Lock()
+
+def update_app_data(update):
+    """
+    Load, modify and save app_data.json under the write lock, so the change
+    cannot overwrite concurrent analytics increments
+    
+    Args:
+        update: Function modifying the loaded app data dict in place
+    Returns the saved app data
+    """
+    with _analytics_write_lock:
+        app_data = load_app_data()
+        update(app_data)
+        save_app_data(app_data)
+        if "analytics" in app_data:
+            _publish_analytics(app_data["analytics"])
+    return app_data
 
+@timed("settings.increment_stat")
 def increment_stat(stat_name, product_id=None):
     """
     Increment a statistics counter
@@ -85,58 +167,117 @@ def increment_stat(stat_name, product_id=None):
         stat_name: Name of the stat (e.g., 'total_likes', 'total_views')
         product_id: Optional product ID for product-specific stats
     """
-    analytics = load_analytics()
+    increment_stats({stat_name: 1}, product_id)
+
+@timed("settings.increment_stats")
+def increment_stats(deltas, product_ids=None, visitor_id=None, dedup_key=None):
+    """
+    Apply several stat deltas in one load/modify/save of app_data.json
     
-    # Increment total stat
-    if stat_name in analytics:
-        analytics[stat_name] += 1
+    Args:
+        deltas: Dict of stat name -> amount (e.g., {'total_views': 1, 'total_clicks': 1})
+        product_ids: Optional product ID or list of IDs; each product gets
+            the deltas and the totals grow once per product
+        visitor_id: Who caused the events, defaults to the Streamlit session.
+            Repeats of an event by the same visitor within
+            visitors.DEDUP_WINDOW are dropped, and unique visitors are
+            counted per stat and product.
+        dedup_key: Identifies events without a product for the repeat check
+            (e.g., the search query)
+    """
+    if product_ids is None:
+        product_ids = []
+    elif isinstance(product_ids, (str, int)) or not hasattr(product_ids, "__iter__"):
+        product_ids = [product_ids]
     else:
-        analytics[stat_name] = 1
+        product_ids = list(product_ids)
+    if visitor_id is None:
+        visitor_id = get_session_id()
     
-    # Track product-specific stats
-    if product_id is not None:
-        if "product_stats" not in analytics:
-            analytics["product_stats"] = {}
+    # (stat, product ID or None, delta) left after dropping repeats
+    events = []
+    for stat_name, delta in deltas.items():
+        for product_id in product_ids or [None]:
+            key = product_id if product_id is not None else dedup_key
+            if visitor_id is not None and is_repeat(visitor_id, stat_name, key):
+                continue
+            events.append((stat_name, product_id, delta))
+    if not events:
+        return
+    if visitor_id is not None:
+        record_visitor(visitor_id, [(stat_name, product_id) for stat_name, product_id, _ in events])
+    
+    start = time.perf_counter()
+    with _analytics_write_lock:
+        app_data = load_app_data()
+        analytics = app_data.setdefault("analytics", get_default_app_data()["analytics"])
+        product_stats = analytics.setdefault("product_stats", {})
         
-        product_id_str = str(product_id)
-        if product_id_str not in analytics["product_stats"]:
-            analytics["product_stats"][product_id_str] = {
-                "likes": 0,
-                "views": 0,
-                "clicks": 0,
-                "link_visits": 0
-            }
+        for stat_name, product_id, delta in events:
+            # Increment total stat
+            analytics[stat_name] = analytics.get(stat_name, 0) + delta
+            
+            # Track product-specific stats
+            if product_id is not None:
+                stats = product_stats.setdefault(str(product_id), {
+                    "likes": 0,
+                    "views": 0,
+                    "clicks": 0,
+                    "link_visits": 0
+                })
+                if stat_name in PRODUCT_STAT_MAPPING:
+                    product_stat = PRODUCT_STAT_MAPPING[stat_name]
+                    stats[product_stat] = stats.get(product_stat, 0) + delta
         
-        # Map stat name to product stat
-        stat_mapping = {
-            "total_likes": "likes",
-            "total_views": "views",
-            "total_clicks": "clicks",
-            "total_link_visits": "link_visits"
-        }
-        
-        if stat_name in stat_mapping:
-            product_stat = stat_mapping[stat_name]
-            analytics["product_stats"][product_id_str][product_stat] += 1
+        save_app_data(app_data)
+        _publish_analytics(analytics)
+    
+    observe("asankar_increment_stat_seconds", time.perf_counter() - start)
+    for stat_name, _, delta in events:
+        inc_counter("asankar_stat_increments_total", delta, labels={"stat": stat_name})
+
+def migrate_product_stats(id_map):
+    """
+    One-time remap of product_stats from positional row keys to stable IDs
     
-    save_analytics(analytics)
+    Args:
+        id_map: Dict of old key (row position as str) -> stable product ID
+    """
+    if load_analytics().get("product_id_scheme") == "stable":
+        return
+    
+    def remap(app_data):
+        analytics = app_data.setdefault("analytics", get_default_app_data()["analytics"])
+        # Another session may have migrated while we waited for the lock
+        if analytics.get("product_id_scheme") == "stable":
+            return
+        new_stats = {}
+        for old_key, stats in analytics.get("product_stats", {}).items():
+            # Keys for rows that no longer exist are kept as they were
+            new_key = id_map.get(old_key, old_key)
+            if new_key in new_stats:
+                for name, value in stats.items():
+                    new_stats[new_key][name] = new_stats[new_key].get(name, 0) + value
+            else:
+                new_stats[new_key] = dict(stats)
+        
+        analytics["product_stats"] = new_stats
+        analytics["product_id_scheme"] = "stable"
     
-    # Update session state
-    if "analytics" in st.session_state:
-        st.session_state.analytics = analytics
+    update_app_data(remap)
 
 def get_product_stats(product_id):
     """Get statistics for a specific product"""
-    analytics = load_analytics()
+    analytics = get_analytics_view()
     product_stats = analytics.get("product_stats", {})
     product_id_str = str(product_id)
     
-    return product_stats.get(product_id_str, {
+    return dict(product_stats.get(product_id_str, {
         "likes": 0,
         "views": 0,
         "clicks": 0,
         "link_visits": 0
-    })
+    }))
 
 def get_top_products(stat_type="likes", limit=10):
     """
@@ -159,51 +300,71 @@ def get_top_products(stat_type="likes", limit=10):
     return sorted_products[:limit]
 
 # ---------- Google Sheet with improved error handling ----------
+def fetch_sheet_records():
+    """Read every row of the configured Google Sheet as a list of dicts"""
+    # Validate secrets exist
+    if "gcp_service_account" not in st.secrets:
+        raise ValueError("Missing 'gcp_service_account' in secrets.toml")
+    
+    if "google_sheet_id" not in st.secrets:
+        raise ValueError("Missing 'google_sheet_id' in secrets.toml")
+    
+    # Setup credentials
+    scopes = [
+        "https://www.googleapis.com/auth/spreadsheets",
+        "https://www.googleapis.com/auth/drive"
+    ]
+    
+    creds = Credentials.from_service_account_info(
+        st.secrets["gcp_service_account"],
+        scopes=scopes
+    )
+    
+    # Authorize and connect
+    client = gspread.authorize(creds)
+    
+    # Get sheet with retry logic
+    max_retries = 3
+    retry_delay = 1
+    
+    for attempt in range(max_retries):
+        try:
+            sheet = client.open_by_key(st.secrets["google_sheet_id"]).sheet1
+            break
+        except Exception as e:
+            if attempt < max_retries - 1:
+                time.sleep(retry_delay)
+                retry_delay *= 2  # Exponential backoff
+            else:
+                raise e
+    
+    return sheet.get_all_records()
+
+def load_fixture_records(path):
+    """
+    Read a local catalog fixture (.csv or .json list of rows) in the same
+    shape as the sheet records
+    """
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return pd.read_csv(path, dtype=str, keep_default_na=False).to_dict("records")
+
 @st.cache_data(ttl=3600, show_spinner=False)  # Cache for 1 hour
+@timed("settings.load_google_sheet")
 def load_google_sheet():
     """
     Load Google Sheet as a Pandas DataFrame with comprehensive error handling
     Returns: DataFrame with product data
     """
+    fetch_start = time.perf_counter()
     try:
-        # Validate secrets exist
-        if "gcp_service_account" not in st.secrets:
-            raise ValueError("Missing 'gcp_service_account' in secrets.toml")
-        
-        if "google_sheet_id" not in st.secrets:
-            raise ValueError("Missing 'google_sheet_id' in secrets.toml")
-        
-        # Setup credentials
-        scopes = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive"
-        ]
-        
-        creds = Credentials.from_service_account_info(
-            st.secrets["gcp_service_account"],
-            scopes=scopes
-        )
-        
-        # Authorize and connect
-        client = gspread.authorize(creds)
-        
-        # Get sheet with retry logic
-        max_retries = 3
-        retry_delay = 1
-        
-        for attempt in range(max_retries):
-            try:
-                sheet = client.open_by_key(st.secrets["google_sheet_id"]).sheet1
-                break
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
-                    retry_delay *= 2  # Exponential backoff
-                else:
-                    raise e
-        
-        # Get all records
-        records = sheet.get_all_records()
+        fixture_path = os.environ.get(CATALOG_FIXTURE_ENV)
+        if fixture_path:
+            # Local stand-in for the sheet (load tests, offline development)
+            records = load_fixture_records(fixture_path)
+        else:
+            records = fetch_sheet_records()
         
         if not records:
             st.warning("⚠️ Google Sheet is empty")
@@ -225,30 +386,41 @@ def load_google_sheet():
         if missing_cols:
             st.warning(f"⚠️ Missing columns in sheet: {', '.join(missing_cols)}")
         
+        observe("asankar_sheet_fetch_seconds", time.perf_counter() - fetch_start)
         return df
         
     except ValueError as ve:
+        inc_counter("asankar_sheet_fetch_failures_total", labels={"reason": "config"})
         st.error(f"❌ Configuration Error: {ve}")
         st.info("💡 Please add the required secrets to your .streamlit/secrets.toml file")
         return pd.DataFrame()
         
     except gspread.exceptions.SpreadsheetNotFound:
+        inc_counter("asankar_sheet_fetch_failures_total", labels={"reason": "not_found"})
         st.error("❌ Google Sheet not found. Please check the sheet ID in secrets.toml")
         return pd.DataFrame()
         
     except gspread.exceptions.APIError as api_err:
+        inc_counter("asankar_sheet_fetch_failures_total", labels={"reason": "api_error"})
         st.error(f"❌ Google Sheets API Error: {api_err}")
         st.info("💡 Please check your service account permissions")
         return pd.DataFrame()
         
     except Exception as e:
+        inc_counter("asankar_sheet_fetch_failures_total", labels={"reason": "unexpected"})
         st.error(f"❌ Unexpected error loading data: {e}")
         st.info("💡 Please contact support if this persists")
         return pd.DataFrame()
 
 def refresh_data():
-    """Clear cache and reload data"""
-    st.cache_data.clear()
+    """
+    Reload the sheet on the next run
+    Only the sheet and catalog caches are cleared; the catalog diff then
+    updates the per-product caches for rows that actually changed
+    """
+    from catalog import load_catalog
+    load_google_sheet.clear()
+    load_catalog.clear()
     st.success("✅ Data refreshed!")
     st.rerun()
 
@@ -261,7 +433,10 @@ def sidebar_controls():
     
     # Logo display with fallback
     try:
-        st.sidebar.image("fallback_logo.png", use_container_width=True)
+        st.sidebar.markdown(
+            f'<img src="{get_sidebar_logo_url("fallback_logo.png")}" style="width: 100%;" alt="Asankar">',
+            unsafe_allow_html=True
+        )
     except Exception:
         st.sidebar.markdown("## 🏢 Asankar")
     
@@ -279,8 +454,7 @@ def sidebar_controls():
     
     # Save language preference
     if language != app_data.get("language"):
-        app_data["language"] = language
-        save_app_data(app_data)
+        update_app_data(lambda data: data.update(language=language))
     
     st.sidebar.markdown("---")
     
@@ -0,0 +1,157 @@
+import hashlib
+import threading
+from collections import Counter
+from functools import lru_cache
+from filters import FACET_COLUMNS, split_values
+
+# MinHash signature length = BANDS * ROWS_PER_BAND. Products whose feature
+# Jaccard similarity is s share a band with probability 1 - (1 - s^4)^16:
+# ~0.99 at s = 0.7, ~0.89 at s = 0.6, ~0.49 at s = 0.45, ~0.2 at s = 0.35.
+BANDS = 16
+ROWS_PER_BAND = 4
+NUM_HASHES = BANDS * ROWS_PER_BAND
+
+# Below the band threshold (~0.45, where a pair is found half the time) LSH
+# misses most similar products, so weaker matches are not recommended at all
+MIN_SIMILARITY = 0.45
+
+MAX_BUCKET_SCAN = 200  # members read from one LSH bucket per lookup
+MAX_CANDIDATES = 100  # candidates scored exactly per lookup
+
+_lock = threading.Lock()
+
+# Process-wide index for one catalog version:
+#   features[product_id] -> frozenset of "column:value" strings
+#   signatures[product_id] -> tuple of NUM_HASHES minimum hashes
+#   buckets[band][band values] -> set of product IDs
+_index = {
+    "version": None,
+    "features": {},
+    "signatures": {},
+    "buckets": [{} for _ in range(BANDS)]
+}
+
+# ---------- MinHash ----------
+@lru_cache(maxsize=4096)
+def _feature_hashes(feature):
+    """NUM_HASHES independent 64-bit hashes of one feature"""
+    return tuple(
+        int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8, salt=i.to_bytes(16, "big")).digest(), "big")
+        for i in range(NUM_HASHES)
+    )
+
+@lru_cache(maxsize=16384)
+def compute_signature(features):
+    """MinHash signature of a feature set (catalogs repeat sets a lot, hence the cache)"""
+    if not features:
+        return None
+    return tuple(min(column) for column in zip(*(_feature_hashes(feature) for feature in features)))
+
+def get_features(row, columns):
+    """Tags, colors and materials of a product as "column:value" strings"""
+    return frozenset(f"{col}:{value}" for col in columns for value in split_values(row.get(col)))
+
+def jaccard(a, b):
+    """Exact Jaccard similarity of two sets"""
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+# ---------- Index maintenance ----------
+def _band_keys(signature):
+    """(band number, band values) for each LSH band of a signature"""
+    return [
+        (band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])
+        for band in range(BANDS)
+    ]
+
+def _add_rows(df, product_ids):
+    """Index the given products (must not be indexed yet)"""
+    columns = [col for cols in FACET_COLUMNS.values() for col in cols if col in df.columns]
+    rows = df.loc[list(product_ids), columns] if columns else df.loc[list(product_ids), []]
+    for product_id, row in rows.iterrows():
+        features = get_features(row, columns)
+        signature = compute_signature(features)
+        _index["features"][product_id] = features
+        if signature is None:
+            continue
+        _index["signatures"][product_id] = signature
+        for band, key in _band_keys(signature):
+            _index["buckets"][band].setdefault(key, set()).add(product_id)
+
+def _remove_rows(product_ids):
+    """Drop the given products from the index"""
+    for product_id in product_ids:
+        _index["features"].pop(product_id, None)
+        signature = _index["signatures"].pop(product_id, None)
+        if signature is None:
+            continue
+        for band, key in _band_keys(signature):
+            members = _index["buckets"][band].get(key)
+            if members is None:
+                continue
+            members.discard(product_id)
+            if not members:
+                del _index["buckets"][band][key]
+
+def update_index(df, version, diff=None):
+    """
+    Bring the similarity index to a catalog version
+
+    With a diff from the indexed version only added/removed/changed
+    products are re-hashed, otherwise everything is rebuilt.
+    """
+    with _lock:
+        if _index["version"] == version:
+            return
+
+        if diff and _index["version"] is not None and _index["version"] == diff.get("from_version"):
+            stale = set(diff["removed"]) | set(diff["changed"])
+            fresh = [pid for pid in list(diff["added"]) + list(diff["changed"]) if pid in df.index]
+            _remove_rows(stale)
+            _add_rows(df, fresh)
+        else:
+            _index["features"] = {}
+            _index["signatures"] = {}
+            _index["buckets"] = [{} for _ in range(BANDS)]
+            _add_rows(df, df.index)
+
+        _index["version"] = version
+
+def ensure_index(df):
+    """Build the index if it is not for this DataFrame's catalog version"""
+    version = df.attrs.get("catalog_version") or "unversioned"
+    if _index["version"] != version:
+        update_index(df, version)
+
+# ---------- Lookups ----------
+def get_similar_products(df, product_id, limit=4, min_similarity=MIN_SIMILARITY):
+    """
+    Products sharing the most tags, colors and materials with one product
+    Returns [(product_id, jaccard similarity)], most similar first
+    """
+    ensure_index(df)
+    with _lock:
+        signature = _index["signatures"].get(product_id)
+        if signature is None:
+            return []
+        features = _index["features"][product_id]
+
+        # Products sharing more bands are more likely to be similar
+        hits = Counter()
+        for band, key in _band_keys(signature):
+            members = _index["buckets"][band].get(key, ())
+            for count, other in enumerate(members):
+                if count >= MAX_BUCKET_SCAN:
+                    break
+                if other != product_id:
+                    hits[other] += 1
+
+        scored = [
+            (other, jaccard(features, _index["features"][other]))
+            for other, _ in hits.most_common(MAX_CANDIDATES)
+        ]
+
+    scored = [(other, score) for other, score in scored if score >= min_similarity]
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored[:limit]
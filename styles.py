@@ -0,0 +1,87 @@
+import hashlib
+import re
+import streamlit as st
+import streamlit.components.v1 as components
+
+# Registered CSS blocks, in registration order (name -> css)
+_styles = {}
+
+# ----------------- Registry -----------------
+def register_style(name, css):
+    """
+    Register a named CSS block for the app stylesheet
+    Registering the same name again replaces the earlier block, so callers
+    can register on every rerun without growing the stylesheet
+    """
+    css = re.sub(r"</?style[^>]*>", "", css)
+    _styles[name] = css
+
+def minify_css(css):
+    """Strip comments and redundant whitespace from CSS"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = css.replace(": ", ":").replace(";}", "}")
+    return css.strip()
+
+def split_css_rules(css):
+    """Split minified CSS into top-level rules (at-rules kept whole)"""
+    rules = []
+    depth = 0
+    start = 0
+    for pos, char in enumerate(css):
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                rules.append(css[start:pos + 1])
+                start = pos + 1
+    return rules
+
+def build_stylesheet():
+    """
+    Combine every registered block into one minified stylesheet
+    Identical rules are kept once, at their last position, so the cascade
+    is the same as with the duplicates in place
+    """
+    rules = split_css_rules(minify_css("".join(_styles.values())))
+    last_seen = {rule: pos for pos, rule in enumerate(rules)}
+    return "".join(rule for pos, rule in enumerate(rules) if last_seen[rule] == pos)
+
+def get_stylesheet_hash(css):
+    """Short content hash used to name the stylesheet"""
+    return hashlib.sha1(css.encode("utf-8")).hexdigest()[:12]
+
+# ----------------- Injection -----------------
+def inject_styles():
+    """
+    Emit the combined stylesheet once per session
+
+    The CSS is installed as <style id="app-styles-HASH"> in the page head,
+    where it survives reruns. Later reruns emit nothing unless the
+    registered CSS changes and produces a new hash.
+    """
+    css = build_stylesheet()
+    digest = get_stylesheet_hash(css)
+
+    if st.session_state.get("styles_hash") == digest:
+        return
+
+    # Escape the closing tag so CSS content cannot end the script early
+    css_literal = css.replace("\\", "\\\\").replace("`", "\\`").replace("${", "\\${").replace("</", "<\\/")
+    components.html(f"""
+    <script>
+        const doc = window.parent.document;
+        const styleId = "app-styles-{digest}";
+        if (!doc.getElementById(styleId)) {{
+            doc.querySelectorAll("style[id^='app-styles-']").forEach((el) => el.remove());
+            const style = doc.createElement("style");
+            style.id = styleId;
+            style.textContent = `{css_literal}`;
+            doc.head.appendChild(style);
+        }}
+    </script>
+    """, height=0)
+
+    st.session_state.styles_hash = digest
@@ -0,0 +1,104 @@
+"""
+link_health against a local HTTP stub
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import link_health
+
+SLOW_SECONDS = 1.0
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """/ok 200, /missing 404, /no-head 405 on HEAD but 200 on GET, /slow sleeps"""
+    def _reply(self, head):
+        if self.path == "/slow":
+            time.sleep(SLOW_SECONDS)
+        if self.path == "/missing":
+            status = 404
+        elif self.path == "/no-head" and head:
+            status = 405
+        else:
+            status = 200
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._reply(head=True)
+
+    def do_GET(self):
+        self._reply(head=False)
+
+    def log_message(self, format, *args):
+        pass
+
+class LinkHealthTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.saved_file = link_health.HEALTH_FILE
+        link_health.HEALTH_FILE = os.path.join(self.work_dir.name, "link_health.json")
+        link_health._health = None
+
+    def tearDown(self):
+        link_health.HEALTH_FILE = self.saved_file
+        link_health._health = None
+        self.work_dir.cleanup()
+
+    def url(self, path):
+        return self.base_url + path
+
+    def test_check_urls_statuses(self):
+        urls = [self.url("/ok"), self.url("/missing"), self.url("/no-head")]
+        results = asyncio.run(link_health.check_urls(urls, timeout=2))
+        self.assertEqual(results[self.url("/ok")]["status"], 200)
+        self.assertTrue(results[self.url("/ok")]["ok"])
+        self.assertEqual(results[self.url("/missing")]["status"], 404)
+        self.assertFalse(results[self.url("/missing")]["ok"])
+        # HEAD is refused, the GET fallback succeeds
+        self.assertTrue(results[self.url("/no-head")]["ok"])
+
+    def test_slow_url_times_out(self):
+        results = asyncio.run(link_health.check_urls([self.url("/slow")], timeout=SLOW_SECONDS / 4))
+        self.assertFalse(results[self.url("/slow")]["ok"])
+        self.assertIsNone(results[self.url("/slow")]["status"])
+
+    def test_results_are_cached(self):
+        link_health.run_health_check([self.url("/missing")], timeout=2)
+        self.assertTrue(link_health.is_broken(self.url("/missing")))
+        # A fresh result is not checked again
+        self.assertEqual(link_health.run_health_check([self.url("/missing")], timeout=2), {})
+
+    def test_urls_scheduled_during_a_check_are_queued(self):
+        link_health.schedule_health_check([self.url("/slow")])
+        link_health.schedule_health_check([self.url("/missing")])
+        deadline = time.time() + 10 * SLOW_SECONDS
+        while link_health._running and time.time() < deadline:
+            time.sleep(0.05)
+        store = link_health.load_health()
+        self.assertIn(self.url("/slow"), store)
+        self.assertIn(self.url("/missing"), store)
+
+if __name__ == "__main__":
+    unittest.main()
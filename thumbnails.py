@@ -0,0 +1,292 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from PIL import Image, ImageOps
+from assets import get_static_path, get_static_url
+
+# Originals are kept out of static/, only thumbnails are served
+ORIGINALS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "originals")
+THUMBNAILS_DIR = get_static_path("thumbs")
+
+# Card width in CSS px for each grid column count (sized for ~1400px wide pages)
+COLUMN_WIDTHS = {1: 1200, 2: 800, 3: 560, 4: 440, 5: 360, 6: 320, 7: 280}
+MODAL_COLUMNS = 2
+
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+MAX_ORIGINAL_BYTES = 20 * 1024 * 1024
+FETCH_TIMEOUT = 10
+FAILURE_TTL = 15 * 60  # seconds before a failed URL is tried again
+TOUCH_INTERVAL = 60  # seconds between mtime updates of a file served from cache
+MAX_TOUCH_ENTRIES = 10_000
+BUILD_WORKERS = 6
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+_lock = threading.Lock()
+# url key -> [lock, number of builds using it]; dropped when the last one finishes
+_url_locks = {}
+# (url key, width) -> time of the last failed build
+_failures = {}
+# (url key, width) of builds queued or running
+_pending = set()
+# path -> time of its last mtime update on a cache hit
+_touched = {}
+_cache_bytes = None
+
+# Shared by all sessions, so concurrent downloads stay bounded per process
+_executor = ThreadPoolExecutor(max_workers=BUILD_WORKERS, thread_name_prefix="thumbnails")
+
+# ---------- Naming ----------
+def get_thumbnail_width(columns_count=3):
+    """Thumbnail width for a grid with the given number of columns"""
+    return COLUMN_WIDTHS.get(columns_count, COLUMN_WIDTHS[3])
+
+def get_url_key(url):
+    """Stable file name stem for a media URL"""
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:20]
+
+def get_thumbnail_name(url, width, fmt="webp"):
+    """File name of one thumbnail variant"""
+    return f"{get_url_key(url)}_{width}.{fmt}"
+
+# ---------- LRU disk cache ----------
+def _iter_cache_files():
+    """Yield (path, size, mtime) for every cached original and thumbnail"""
+    for directory in (ORIGINALS_DIR, THUMBNAILS_DIR):
+        if not os.path.isdir(directory):
+            continue
+        for entry in os.scandir(directory):
+            if entry.is_file():
+                stat = entry.stat()
+                yield entry.path, stat.st_size, stat.st_mtime
+
+def _touch(path):
+    """Mark a cache file as recently used"""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+def _touch_on_hit(path, now=None):
+    """
+    _touch for cache hits, at most once per TOUCH_INTERVAL per file
+    Eviction goes by mtime, so hits must refresh it for the cache to be LRU
+    """
+    now = now or time.time()
+    with _lock:
+        if now - _touched.get(path, 0) < TOUCH_INTERVAL:
+            return
+        if len(_touched) >= MAX_TOUCH_ENTRIES:
+            _touched.clear()
+        _touched[path] = now
+    _touch(path)
+
+def _write_cache_file(path, data):
+    """Atomically write a cache file and keep the cache under its size limit"""
+    global _cache_bytes
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+    with _lock:
+        if _cache_bytes is None:
+            _cache_bytes = sum(size for _, size, _ in _iter_cache_files())
+        else:
+            _cache_bytes += len(data)
+        if _cache_bytes > MAX_CACHE_BYTES:
+            _evict_locked()
+
+def _evict_locked():
+    """Delete least recently used files until the cache is at 90% of its limit"""
+    global _cache_bytes
+    files = sorted(_iter_cache_files(), key=lambda item: item[2])
+    total = sum(size for _, size, _ in files)
+    for path, size, _ in files:
+        if total <= MAX_CACHE_BYTES * 0.9:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+    _cache_bytes = total
+
+def evict_url(url):
+    """Remove the original and all thumbnails cached for a URL"""
+    global _cache_bytes
+    key = get_url_key(url)
+    with _lock:
+        for path, _, _ in list(_iter_cache_files()):
+            if os.path.basename(path).startswith(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        _cache_bytes = None
+
+# ---------- Fetch & render ----------
+def fetch_original(url):
+    """Return original image bytes, downloading them only once"""
+    path = os.path.join(ORIGINALS_DIR, get_url_key(url))
+    if os.path.exists(path):
+        _touch(path)
+        with open(path, "rb") as f:
+            return f.read()
+
+    # Closing the streamed response returns its connection to the pool
+    with requests.get(url, timeout=FETCH_TIMEOUT, stream=True) as response:
+        response.raise_for_status()
+        data = response.raw.read(MAX_ORIGINAL_BYTES + 1, decode_content=True)
+    if len(data) > MAX_ORIGINAL_BYTES:
+        raise ValueError("Image too large")
+
+    _write_cache_file(path, data)
+    return data
+
+def render_variants(data, width):
+    """Render WebP and JPEG thumbnails of an image at the given width"""
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.width > width:
+            height = round(image.height * width / image.width)
+            image = image.resize((width, height), Image.LANCZOS)
+
+        has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+        webp_image = image.convert("RGBA" if has_alpha else "RGB")
+        webp_buffer = io.BytesIO()
+        webp_image.save(webp_buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+
+        jpeg_image = image.convert("RGB")
+        if has_alpha:
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(webp_image, mask=webp_image.getchannel("A"))
+            jpeg_image = background
+        jpeg_buffer = io.BytesIO()
+        jpeg_image.save(jpeg_buffer, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+
+    return {"webp": webp_buffer.getvalue(), "jpg": jpeg_buffer.getvalue()}
+
+def _get_cached_names(url, width):
+    """(WebP name, JPEG name) if both variants are on disk, else None"""
+    names = (get_thumbnail_name(url, width, "webp"), get_thumbnail_name(url, width, "jpg"))
+    paths = [os.path.join(THUMBNAILS_DIR, name) for name in names]
+    if not all(os.path.exists(path) for path in paths):
+        return None
+    for path in paths:
+        _touch_on_hit(path)
+    return names
+
+def _failed_recently(key):
+    """Whether the build for (url key, width) failed less than FAILURE_TTL ago"""
+    with _lock:
+        failed_at = _failures.get(key)
+        if failed_at is not None and time.time() - failed_at >= FAILURE_TTL:
+            del _failures[key]
+            failed_at = None
+    return failed_at is not None
+
+def ensure_thumbnail(url, columns_count=3):
+    """
+    Make sure the thumbnails for a URL exist for a grid column count
+    Blocks while downloading, so only call it off the script thread.
+    Returns the WebP file name, or None if the image cannot be processed
+    """
+    width = get_thumbnail_width(columns_count)
+    names = _get_cached_names(url, width)
+    if names:
+        return names[0]
+
+    url_key = get_url_key(url)
+    if _failed_recently((url_key, width)):
+        return None
+
+    # One render per URL at a time, concurrent callers wait for it
+    with _lock:
+        entry = _url_locks.setdefault(url_key, [threading.Lock(), 0])
+        entry[1] += 1
+
+    try:
+        with entry[0]:
+            names = _get_cached_names(url, width)
+            if names:
+                return names[0]
+            try:
+                variants = render_variants(fetch_original(url), width)
+            except Exception:
+                with _lock:
+                    _failures[(url_key, width)] = time.time()
+                return None
+            for fmt, data in variants.items():
+                _write_cache_file(os.path.join(THUMBNAILS_DIR, get_thumbnail_name(url, width, fmt)), data)
+        return get_thumbnail_name(url, width, "webp")
+    finally:
+        with _lock:
+            entry[1] -= 1
+            if not entry[1]:
+                _url_locks.pop(url_key, None)
+
+def _build(url, columns_count, cancel_event):
+    """Executor task: build one URL's thumbnails unless cancelled"""
+    if cancel_event is None or not cancel_event.is_set():
+        ensure_thumbnail(url, columns_count)
+
+def submit_thumbnail(url, columns_count=3, cancel_event=None):
+    """
+    Build a URL's thumbnails in the background
+    Returns the Future, or None if a build is already queued or failed recently
+    """
+    key = (get_url_key(url), get_thumbnail_width(columns_count))
+    if _failed_recently(key):
+        return None
+    with _lock:
+        if key in _pending:
+            return None
+        _pending.add(key)
+    future = _executor.submit(_build, url, columns_count, cancel_event)
+
+    def done(_):
+        with _lock:
+            _pending.discard(key)
+
+    # Also runs when the future is cancelled before it started
+    future.add_done_callback(done)
+    return future
+
+def get_thumbnail(url, columns_count=3):
+    """
+    Local path of the WebP thumbnail for st.image, or None
+    A missing thumbnail is built in the background, so callers show the
+    original URL for now
+    """
+    width = get_thumbnail_width(columns_count)
+    names = _get_cached_names(url, width)
+    if not names:
+        submit_thumbnail(url, columns_count)
+        return None
+    return os.path.join(THUMBNAILS_DIR, names[0])
+
+def get_thumbnail_urls(url, columns_count=3):
+    """
+    Static URLs of the WebP and JPEG thumbnails for HTML, or None
+    Like get_thumbnail, a missing thumbnail is built in the background
+    """
+    urls = get_cached_thumbnail_urls(url, columns_count)
+    if urls is None:
+        submit_thumbnail(url, columns_count)
+    return urls
+
+def get_cached_thumbnail_urls(url, columns_count=3):
+    """Like get_thumbnail_urls, but never schedules a build: None unless already rendered"""
+    names = _get_cached_names(url, get_thumbnail_width(columns_count))
+    if not names:
+        return None
+    return {
+        "webp": get_static_url("thumbs", names[0]),
+        "jpg": get_static_url("thumbs", names[1])
+    }
@@ -0,0 +1,142 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+import hll
+
+# Unique visitor sketches, next to app_data.json. Several worker processes
+# can share the file: sketches are merged (register max) on every flush.
+SKETCH_FILE = "analytics_sketches.json"
+FLUSH_INTERVAL = 10  # seconds between writes of the sketch file
+
+# A visitor repeating the same event within this window is not counted again
+DEDUP_WINDOW = 30 * 60
+MAX_DEDUP_ENTRIES = 100_000
+
+# Sketch of every visitor who opened the app, not tied to a counter
+VISIT_STAT = "visits"
+
+_lock = threading.Lock()
+# {"totals": {stat: sketch}, "products": {product_id: {stat: sketch}}}
+_sketches = None
+_dirty = False
+_last_flush = 0.0
+# (visitor, stat, key) -> time of the last counted event, oldest first
+_recent = OrderedDict()
+
+# ---------- Sketch store ----------
+def _read_file():
+    """Sketches stored on disk, decoded"""
+    try:
+        with open(SKETCH_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"totals": {}, "products": {}}
+    return {
+        "totals": {stat: hll.decode(text) for stat, text in data.get("totals", {}).items()},
+        "products": {
+            product_id: {stat: hll.decode(text) for stat, text in stats.items()}
+            for product_id, stats in data.get("products", {}).items()
+        }
+    }
+
+def _merge_into(target, source):
+    """Union the sketches of source into target"""
+    for stat, sketch in source["totals"].items():
+        hll.merge(target["totals"].setdefault(stat, hll.new_sketch()), sketch)
+    for product_id, stats in source["products"].items():
+        product = target["products"].setdefault(product_id, {})
+        for stat, sketch in stats.items():
+            hll.merge(product.setdefault(stat, hll.new_sketch()), sketch)
+
+def _load_locked():
+    """Load the sketches once per process (caller holds _lock)"""
+    global _sketches
+    if _sketches is None:
+        _sketches = _read_file()
+    return _sketches
+
+def flush_sketches():
+    """Merge with what other processes wrote and persist the sketches"""
+    global _dirty, _last_flush
+    with _lock:
+        if _sketches is None:
+            return
+        _merge_into(_sketches, _read_file())
+        data = {
+            "totals": {stat: hll.encode(sketch) for stat, sketch in _sketches["totals"].items()},
+            "products": {
+                product_id: {stat: hll.encode(sketch) for stat, sketch in stats.items()}
+                for product_id, stats in _sketches["products"].items()
+            }
+        }
+        _dirty = False
+        _last_flush = time.time()
+
+    tmp_path = f"{SKETCH_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, SKETCH_FILE)
+
+def _flush_on_exit():
+    """Write sketches recorded since the last flush"""
+    if _dirty:
+        flush_sketches()
+
+atexit.register(_flush_on_exit)
+
+# ---------- Recording ----------
+def is_repeat(visitor_id, stat_name, key=None, now=None):
+    """
+    Whether this visitor already triggered this event (stat + product or
+    other key) within DEDUP_WINDOW. Records the event if it is new.
+    """
+    now = now or time.time()
+    event = (str(visitor_id), stat_name, None if key is None else str(key))
+    with _lock:
+        seen = _recent.get(event)
+        if seen is not None and now - seen < DEDUP_WINDOW:
+            return True
+        _recent[event] = now
+        _recent.move_to_end(event)
+        while len(_recent) > MAX_DEDUP_ENTRIES:
+            _recent.popitem(last=False)
+    return False
+
+def record_visitor(visitor_id, events):
+    """
+    Add a visitor to the unique sketches of each (stat, product_id) event
+    product_id None only counts towards the stat's total
+    """
+    global _dirty
+    if not events:
+        return
+    with _lock:
+        sketches = _load_locked()
+        for stat_name, product_id in events:
+            hll.add(sketches["totals"].setdefault(stat_name, hll.new_sketch()), visitor_id)
+            if product_id is not None:
+                product = sketches["products"].setdefault(str(product_id), {})
+                hll.add(product.setdefault(stat_name, hll.new_sketch()), visitor_id)
+        _dirty = True
+        flush = time.time() - _last_flush >= FLUSH_INTERVAL
+    if flush:
+        flush_sketches()
+
+def record_visit(visitor_id):
+    """Count a visitor towards the unique visitors of the app"""
+    if visitor_id is not None:
+        record_visitor(visitor_id, [(VISIT_STAT, None)])
+
+# ---------- Counts ----------
+def get_unique_count(stat_name, product_id=None):
+    """Estimated unique visitors for a stat, overall or for one product"""
+    with _lock:
+        sketches = _load_locked()
+        if product_id is None:
+            sketch = sketches["totals"].get(stat_name)
+        else:
+            sketch = sketches["products"].get(str(product_id), {}).get(stat_name)
+        return hll.estimate(sketch) if sketch is not None else 0